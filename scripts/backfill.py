@@ -0,0 +1,95 @@
+import argparse
+import logging
+import sys
+from pathlib import Path
+
+from sqlalchemy import create_engine
+
+# Добавляем путь к src в PYTHONPATH
+src_path = Path(__file__).parent.parent / "src"
+sys.path.append(str(src_path))
+
+from app.config.settings import settings  # noqa: E402
+from app.migrations import (  # noqa: E402
+    backfill_status,
+    reset_backfill,
+    run_backfill,
+)
+
+# Backfill больших таблиц отдельно от деплоя: UPDATE пачками по ключу
+# с паузами и ожиданием реплик. Прогресс хранится в БД, поэтому прерванный
+# запуск (Ctrl+C, рестарт) продолжается с той же команды.
+#
+# Запуск:
+#   python scripts/backfill.py run fill_user_id example \
+#       --set "user_id = '00000000-0000-0000-0000-000000000000'" \
+#       --where "user_id IS NULL" --batch-size 5000 --sleep 0.05
+#   python scripts/backfill.py status
+#   python scripts/backfill.py reset fill_user_id
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Backfill больших таблиц пачками")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="Запустить или продолжить backfill")
+    run.add_argument("name", help="Имя backfill - ключ в таблице прогресса")
+    run.add_argument("table")
+    run.add_argument("--set", dest="set_clause", required=True, help="SQL после SET")
+    run.add_argument("--where", help="Доп. условие на строки, например col IS NULL")
+    run.add_argument("--key", default="id", help="Целочисленный ключ для пачек")
+    run.add_argument("--batch-size", type=int, default=settings.BACKFILL_BATCH_SIZE)
+    run.add_argument("--sleep", type=float, default=settings.BACKFILL_SLEEP)
+    run.add_argument(
+        "--max-lag",
+        type=float,
+        default=settings.BACKFILL_MAX_REPLICATION_LAG,
+        help="Допустимое отставание реплик, сек",
+    )
+
+    commands.add_parser("status", help="Показать прогресс всех backfill")
+
+    reset = commands.add_parser("reset", help="Начать backfill сначала")
+    reset.add_argument("name")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    engine = create_engine(settings.DATABASE_URL, isolation_level="AUTOCOMMIT")
+    try:
+        with engine.connect() as connection:
+            if args.command == "run":
+                run_backfill(
+                    connection,
+                    args.name,
+                    args.table,
+                    args.set_clause,
+                    where=args.where,
+                    key=args.key,
+                    batch_size=args.batch_size,
+                    sleep=args.sleep,
+                    max_lag=args.max_lag,
+                )
+            elif args.command == "status":
+                for row in backfill_status(connection):
+                    state = "done" if row["done"] else "in progress"
+                    print(
+                        f"{row['name']}: {state}, {row['rows']} rows, "
+                        f"last key {row['last_key']}, updated {row['updated_at']}"
+                    )
+            else:
+                reset_backfill(connection, args.name)
+    except KeyboardInterrupt:
+        print("Прервано - запустите ту же команду, чтобы продолжить", file=sys.stderr)
+        sys.exit(130)
+    except TimeoutError as e:
+        print(f"{e} - запустите ту же команду позже", file=sys.stderr)
+        sys.exit(1)
+    finally:
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,228 @@
+import argparse
+import asyncio
+import json
+import os
+import secrets
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+
+# Добавляем путь к src в PYTHONPATH
+src_path = Path(__file__).parent.parent / "src"
+sys.path.append(str(src_path))
+
+# Нагрузочный бенчмарк API: поднимает приложение в этом же процессе (uvicorn
+# в отдельном потоке) на DATABASE_URL из .env (например, Postgres из
+# docker-compose), наполняет таблицу и гоняет конкурентные запросы.
+# Supabase не нужен: токены проверяются локально по секрету, который
+# бенчмарк генерирует сам. Результат - JSON с RPS и перцентилями задержки
+# по каждому сценарию, чтобы сравнивать между коммитами.
+#
+# Запуск: python scripts/bench_api.py --seed 10000 --concurrency 32 --output out.json
+
+SCENARIOS = {
+    # Базовая линия: роут без БД, без cookie
+    "root": ("/", False),
+    # То же с cookie - разница показывает накладные расходы AuthMiddleware
+    "root_auth": ("/", True),
+    "auth_me": ("/auth/me", True),
+    "examples": ("/examples/", True),
+}
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Нагрузочный бенчмарк API")
+    parser.add_argument("--seed", type=int, default=0, help="Сколько строк добавить")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=2000, help="На сценарий")
+    parser.add_argument("--warmup", type=int, default=100, help="На сценарий")
+    parser.add_argument(
+        "--scenario",
+        action="append",
+        choices=list(SCENARIOS),
+        help="Можно указать несколько раз; по умолчанию - все",
+    )
+    parser.add_argument("--no-cache", action="store_true", help="Без кэша чтений")
+    parser.add_argument(
+        "--no-auth-cache",
+        action="store_true",
+        help="Проверять подпись токена на каждом запросе",
+    )
+    parser.add_argument("--output", type=Path, help="Файл для JSON результата")
+    return parser.parse_args()
+
+
+def configure_env(args: argparse.Namespace) -> str:
+    """Настраивает приложение до импорта: локальная проверка JWT вместо Supabase."""
+    jwt_secret = secrets.token_urlsafe(32)
+    os.environ["AUTH_VERIFY_MODE"] = "local"
+    os.environ["AUTH_REMOTE_FALLBACK"] = "false"
+    os.environ["SUPABASE_JWT_SECRET"] = jwt_secret
+    os.environ.setdefault("SUPABASE_URL", "http://localhost")
+    os.environ.setdefault("SUPABASE_SERVICE_ROLE_KEY", "bench")
+    if args.no_cache:
+        os.environ["CACHE_ENABLED"] = "false"
+    if args.no_auth_cache:
+        os.environ["AUTH_CACHE_ENABLED"] = "false"
+    return jwt_secret
+
+
+def make_token(jwt_secret: str) -> str:
+    import jwt
+
+    claims = {
+        "sub": str(uuid.uuid4()),
+        "email": "bench@example.com",
+        "role": "authenticated",
+        "aud": "authenticated",
+        "exp": int(time.time()) + 3600,
+    }
+    return jwt.encode(claims, jwt_secret, algorithm="HS256")
+
+
+async def seed(rows: int) -> None:
+    from app.config.db import dispose_db, init_db
+    from app.dto.example import ExampleCreateDTO
+    from app.services.example import ExampleService
+
+    await init_db(warm_connections=0)
+    if rows > 0:
+        started = time.perf_counter()
+        await ExampleService.bulk_create(
+            [ExampleCreateDTO(name=f"bench {i}") for i in range(rows)]
+        )
+        elapsed = time.perf_counter() - started
+        print(f"Добавлено {rows} строк за {elapsed:.1f} с", file=sys.stderr)
+    # Соединения пула привязаны к event loop - сервер в lifespan создаст свои
+    await dispose_db()
+
+
+def start_server():
+    import uvicorn
+
+    from main import app
+
+    config = uvicorn.Config(app, host="127.0.0.1", port=0, log_level="warning")
+    server = uvicorn.Server(config)
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+    port = server.servers[0].sockets[0].getsockname()[1]
+    return server, thread, f"http://127.0.0.1:{port}"
+
+
+def percentile(sorted_values: list[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, round(q * (len(sorted_values) - 1)))
+    return sorted_values[index]
+
+
+async def load(client, path: str, cookies: dict, count: int, concurrency: int):
+    """count запросов в concurrency воркеров: задержки и число ошибок."""
+    latencies: list[float] = []
+    errors = 0
+    remaining = count
+
+    async def worker():
+        nonlocal remaining, errors
+        while remaining > 0:
+            remaining -= 1
+            started = time.perf_counter()
+            try:
+                response = await client.get(path, cookies=cookies)
+                failed = response.status_code >= 400
+            except Exception:
+                failed = True
+            latencies.append(time.perf_counter() - started)
+            errors += failed
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, errors
+
+
+async def run_scenario(client, path: str, cookies: dict, args) -> dict:
+    # Прогрев - отдельной фазой вне замера: пул соединений, кэши, JIT планов
+    await load(client, path, cookies, args.warmup, args.concurrency)
+    started = time.perf_counter()
+    latencies, errors = await load(
+        client, path, cookies, args.requests, args.concurrency
+    )
+    wall = time.perf_counter() - started
+
+    latencies.sort()
+    ms = [value * 1000 for value in latencies]
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": round(len(latencies) / wall, 1) if wall else 0.0,
+        "latency_ms": {
+            "mean": round(statistics.fmean(ms), 3) if ms else 0.0,
+            "p50": round(percentile(ms, 0.50), 3),
+            "p90": round(percentile(ms, 0.90), 3),
+            "p99": round(percentile(ms, 0.99), 3),
+            "max": round(ms[-1], 3) if ms else 0.0,
+        },
+    }
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "HEAD"], text=True, stderr=subprocess.DEVNULL
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def main():
+    args = parse_args()
+    jwt_secret = configure_env(args)
+    token = make_token(jwt_secret)
+
+    import httpx
+
+    await seed(args.seed)
+    server, thread, base_url = start_server()
+
+    results = {}
+    limits = httpx.Limits(max_connections=args.concurrency)
+    try:
+        async with httpx.AsyncClient(base_url=base_url, limits=limits) as client:
+            for name in args.scenario or list(SCENARIOS):
+                path, authenticated = SCENARIOS[name]
+                cookies = {"sb_at": token} if authenticated else {}
+                results[name] = await run_scenario(client, path, cookies, args)
+                print(f"{name}: {results[name]}", file=sys.stderr)
+    finally:
+        server.should_exit = True
+        thread.join()
+
+    report = {
+        "commit": git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "params": {
+            "seed": args.seed,
+            "concurrency": args.concurrency,
+            "requests": args.requests,
+            "warmup": args.warmup,
+            "cache": not args.no_cache,
+            "auth_cache": not args.no_auth_cache,
+        },
+        "scenarios": results,
+    }
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        args.output.write_text(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
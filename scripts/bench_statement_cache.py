@@ -0,0 +1,67 @@
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+# Добавляем путь к src в PYTHONPATH
+src_path = Path(__file__).parent.parent / "src"
+sys.path.append(str(src_path))
+
+from sqlalchemy.ext.asyncio import AsyncSession  # noqa: E402
+
+from app.config import db  # noqa: E402
+from app.config.settings import settings  # noqa: E402
+from app.dao.example import ExampleDAO  # noqa: E402
+from app.dto.example import ExampleCreateDTO  # noqa: E402
+
+# Бенчмарк режимов кэширования запросов на DATABASE_URL:
+# серверные prepared statements psycopg (вкл/выкл) x кэш компиляции SQLAlchemy.
+# Вставки выполняются в транзакции, которая откатывается.
+#
+# Запуск: python scripts/bench_statement_cache.py [кол-во итераций]
+
+MODES = {
+    "prepared + compiled cache": ("prepared", settings.DB_COMPILED_CACHE_SIZE),
+    "prepared, no compiled cache": ("prepared", 0),
+    "no prepare + compiled cache": ("disabled", settings.DB_COMPILED_CACHE_SIZE),
+    "no prepare, no compiled cache": ("disabled", 0),
+}
+
+
+async def run_mode(statement_cache: str, compiled_cache_size: int, iterations: int):
+    settings.DB_STATEMENT_CACHE = statement_cache  # type: ignore
+    settings.DB_COMPILED_CACHE_SIZE = compiled_cache_size
+    engine = db._create_engine(settings.DATABASE_URL)
+    try:
+        async with AsyncSession(engine) as session:
+            created = await ExampleDAO.create(session, ExampleCreateDTO(name="bench"))
+
+            started = time.perf_counter()
+            for _ in range(iterations):
+                await ExampleDAO.get_by_id(session, created.id)
+            select_us = (time.perf_counter() - started) / iterations * 1_000_000
+
+            started = time.perf_counter()
+            for _ in range(iterations):
+                await ExampleDAO.create(session, ExampleCreateDTO(name="bench"))
+            insert_us = (time.perf_counter() - started) / iterations * 1_000_000
+
+            await session.rollback()
+    finally:
+        await engine.dispose()
+    return select_us, insert_us
+
+
+async def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    print(f"{iterations} итераций, мкс на запрос")
+    print(f"{'режим':<32}{'select by id':>14}{'insert':>10}")
+    for name, (statement_cache, compiled_cache_size) in MODES.items():
+        select_us, insert_us = await run_mode(
+            statement_cache, compiled_cache_size, iterations
+        )
+        print(f"{name:<32}{select_us:>14.1f}{insert_us:>10.1f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,145 @@
+import argparse
+import bisect
+import itertools
+import random
+import sys
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import psycopg
+
+# Добавляем путь к src в PYTHONPATH
+src_path = Path(__file__).parent.parent / "src"
+sys.path.append(str(src_path))
+
+from app.config.settings import settings  # noqa: E402
+
+# Наполнение таблицы example синтетическими данными для нагрузочных тестов.
+# Строки генерируются в нескольких процессах, каждый пишет свои пачки через
+# свое соединение бинарным COPY FROM STDIN. user_id распределен по Ципфу
+# (несколько очень активных пользователей и длинный хвост), created_at
+# растянут на --days дней, причем свежих записей больше, чем старых.
+#
+# Запуск: python scripts/seed_examples.py --rows 5000000 --users 50000 --workers 8
+
+COPY_SQL = (
+    "COPY example (name, user_id, created_at, modified_at) FROM STDIN (FORMAT BINARY)"
+)
+COPY_TYPES = ["varchar", "uuid", "timestamptz", "timestamptz"]
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Наполнение таблицы example")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--users", type=int, default=10_000, help="Разных user_id")
+    parser.add_argument(
+        "--zipf", type=float, default=1.1, help="Показатель Ципфа для user_id"
+    )
+    parser.add_argument(
+        "--anonymous", type=float, default=0.05, help="Доля строк без user_id"
+    )
+    parser.add_argument("--days", type=int, default=365, help="Глубина created_at")
+    parser.add_argument("--workers", type=int, default=4, help="Процессов/соединений")
+    parser.add_argument("--chunk", type=int, default=100_000, help="Строк в одном COPY")
+    parser.add_argument("--seed", type=int, default=42, help="Seed генератора")
+    parser.add_argument(
+        "--truncate", action="store_true", help="Очистить таблицу перед наполнением"
+    )
+    return parser.parse_args()
+
+
+def make_users(count: int, exponent: float, seed: int):
+    """user_id и накопленные веса Ципфа: вес k-го пользователя 1 / k^exponent."""
+    rng = random.Random(seed)
+    users = [uuid.UUID(int=rng.getrandbits(128), version=4) for _ in range(count)]
+    cum_weights = list(
+        itertools.accumulate(1 / rank**exponent for rank in range(1, count + 1))
+    )
+    return users, cum_weights
+
+
+# Пользователи и веса передаются в процесс пула один раз, а не с каждой пачкой
+_users: tuple[list[uuid.UUID], list[float]] = ([], [])
+
+
+def _init_worker(users: list[uuid.UUID], cum_weights: list[float]) -> None:
+    global _users
+    _users = (users, cum_weights)
+
+
+def copy_chunk(db_url: str, index: int, rows: int, args: argparse.Namespace) -> int:
+    """Генерирует и записывает одну пачку; выполняется в процессе пула."""
+    rng = random.Random(args.seed * 1_000_003 + index)
+    users, cum_weights = _users
+    total_weight = cum_weights[-1]
+    last = len(users) - 1
+    now = datetime.now(timezone.utc)
+    span = timedelta(days=args.days).total_seconds()
+
+    with psycopg.connect(db_url) as connection:
+        with connection.cursor() as cursor:
+            with cursor.copy(COPY_SQL) as copy:
+                copy.set_types(COPY_TYPES)
+                for number in range(rows):
+                    if rng.random() < args.anonymous:
+                        user_id = None
+                    else:
+                        position = bisect.bisect(
+                            cum_weights, rng.random() * total_weight
+                        )
+                        user_id = users[min(position, last)]
+                    # sqrt смещает даты к настоящему: записей со временем больше
+                    created_at = now - timedelta(
+                        seconds=span * (1 - rng.random() ** 0.5)
+                    )
+                    name = f"example {index}-{number}"
+                    copy.write_row((name, user_id, created_at, created_at))
+    return rows
+
+
+def main():
+    args = parse_args()
+    # Преобразуем URL SQLAlchemy в формат psycopg
+    db_url = settings.DATABASE_URL.replace("postgresql+psycopg://", "postgresql://")
+
+    if args.truncate:
+        with psycopg.connect(db_url) as connection:
+            connection.execute("TRUNCATE example RESTART IDENTITY")
+        print("Таблица example очищена", file=sys.stderr)
+
+    users, cum_weights = make_users(args.users, args.zipf, args.seed)
+    chunks = [
+        (index, min(args.chunk, args.rows - start))
+        for index, start in enumerate(range(0, args.rows, args.chunk))
+    ]
+
+    done = 0
+    started = time.perf_counter()
+    with ProcessPoolExecutor(
+        max_workers=args.workers,
+        initializer=_init_worker,
+        initargs=(users, cum_weights),
+    ) as pool:
+        futures = [
+            pool.submit(copy_chunk, db_url, index, rows, args) for index, rows in chunks
+        ]
+        for future in as_completed(futures):
+            done += future.result()
+            elapsed = time.perf_counter() - started
+            print(
+                f"{done}/{args.rows} строк, {done / elapsed:,.0f} строк/с",
+                file=sys.stderr,
+            )
+
+    elapsed = time.perf_counter() - started
+    # Свежая статистика, иначе планировщик будет считать таблицу пустой
+    with psycopg.connect(db_url, autocommit=True) as connection:
+        connection.execute("ANALYZE example")
+    print(f"Добавлено {done} строк за {elapsed:.1f} с ({done / elapsed:,.0f} строк/с)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,223 @@
+import argparse
 import sys
+import threading
+import time
+from collections import Counter, defaultdict, deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from pathlib import Path
+from urllib.parse import urlsplit
 
 import yt_dlp
 
-if len(sys.argv) > 1:
-    ydl_opts = {
-        "outtmpl": "videos/%(title)s.%(ext)s",
-        "format": "bestvideo[height<=480][ext=mp4]+bestaudio[ext=m4a]/best[height<=480][ext=mp4]/best[height<=480]",
+# Скачивание видео через yt-dlp.
+#
+# Одно видео:   python scripts/youtube_downloader.py <url>
+# Пакетно:      python scripts/youtube_downloader.py --file urls.txt --workers 8
+#               cat urls.txt | python scripts/youtube_downloader.py --file -
+#
+# В пакетном режиме видео качаются пулом потоков (--workers), не больше
+# --per-domain одновременно с одного сайта, каждое - в --fragments потоков
+# фрагментов. Недокачанные файлы докачиваются, а скачанные ранее видео
+# пропускаются по архиву (--archive). Вместо прогресса каждого файла раз в
+# несколько секунд печатается общий прогресс и скорость.
+#
+# Одна ссылка без --file качается как раньше: обычный вывод yt-dlp, без
+# архива и с фрагментами по умолчанию yt-dlp, если --archive и --fragments
+# не заданы явно.
+
+FORMAT = (
+    "bestvideo[height<=480][ext=mp4]+bestaudio[ext=m4a]"
+    "/best[height<=480][ext=mp4]/best[height<=480]"
+)
+REPORT_INTERVAL = 5.0
+BATCH_FRAGMENTS = 4
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Скачивание видео через yt-dlp")
+    parser.add_argument("urls", nargs="*", help="Ссылки на видео")
+    parser.add_argument(
+        "-f", "--file", help="Файл со ссылками, по одной на строку ('-' - stdin)"
+    )
+    parser.add_argument("-o", "--output", default="videos", help="Папка для видео")
+    parser.add_argument("--workers", type=int, default=4, help="Видео одновременно")
+    parser.add_argument(
+        "--per-domain", type=int, default=2, help="Видео одновременно с одного сайта"
+    )
+    parser.add_argument(
+        "--fragments",
+        type=int,
+        default=None,
+        help=f"Потоков фрагментов на видео (в пакетном режиме {BATCH_FRAGMENTS})",
+    )
+    parser.add_argument(
+        "--archive",
+        default=None,
+        help="Архив скачанных видео (в пакетном режиме <output>/archive.txt)",
+    )
+    parser.add_argument("--no-archive", action="store_true", help="Не вести архив")
+    return parser.parse_args()
+
+
+def read_urls(args: argparse.Namespace) -> list[str]:
+    lines = list(args.urls)
+    if args.file == "-":
+        lines.extend(sys.stdin)
+    elif args.file:
+        lines.extend(Path(args.file).read_text().splitlines())
+    # Без пустых строк, комментариев и повторов, порядок сохраняется
+    urls = (line.strip() for line in lines)
+    return list(dict.fromkeys(url for url in urls if url and not url.startswith("#")))
+
+
+def domain(url: str) -> str:
+    host = urlsplit(url).hostname or ""
+    return host.removeprefix("www.").removeprefix("m.")
+
+
+class Progress:
+    """Общий прогресс пакета: хуки yt-dlp вызываются из потоков загрузок."""
+
+    def __init__(self, total: int):
+        self.total = total
+        self.done = 0
+        self.skipped = 0
+        self.failed = 0
+        self.started = time.monotonic()
+        self._lock = threading.Lock()
+        # Файл -> (байт на момент первого хука, байт сейчас): докачка
+        # ранее скачанной части не завышает скорость
+        self._files: dict[str, tuple[int, int]] = {}
+        self._active: set[str] = set()
+
+    def hook(self, status: dict) -> None:
+        filename = status.get("filename") or ""
+        downloaded = status.get("downloaded_bytes") or 0
+        with self._lock:
+            first, _ = self._files.get(filename, (downloaded, 0))
+            self._files[filename] = (first, downloaded)
+            if status["status"] == "downloading":
+                self._active.add(filename)
+            else:
+                self._active.discard(filename)
+
+    def downloaded(self) -> int:
+        with self._lock:
+            return sum(current - first for first, current in self._files.values())
+
+    def finish(self, result: str) -> None:
+        with self._lock:
+            setattr(self, result, getattr(self, result) + 1)
+
+    def report(self) -> str:
+        elapsed = time.monotonic() - self.started
+        megabytes = self.downloaded() / 2**20
+        finished = self.done + self.skipped + self.failed
+        return (
+            f"[{finished}/{self.total}] скачано {self.done}, пропущено "
+            f"{self.skipped}, ошибок {self.failed}, активно {len(self._active)}; "
+            f"{megabytes:.1f} МБ, {megabytes / max(elapsed, 1e-9):.2f} МБ/с"
+        )
+
+
+def download_one(url: str, options: dict, progress: Progress) -> None:
+    hook_calls = 0
+
+    def hook(status: dict) -> None:
+        nonlocal hook_calls
+        hook_calls += 1
+        progress.hook(status)
+
+    # YoutubeDL не потокобезопасен - у каждой загрузки свой экземпляр
+    with yt_dlp.YoutubeDL({**options, "progress_hooks": [hook]}) as ydl:
+        if ydl.download([url]):
+            raise yt_dlp.utils.DownloadError(f"yt-dlp вернул ошибку для {url}")
+    # Без хуков загрузки не было: видео уже есть в архиве
+    progress.finish("done" if hook_calls else "skipped")
+
+
+def download_batch(urls: list[str], options: dict, args: argparse.Namespace) -> int:
+    progress = Progress(len(urls))
+    # Очередь ссылок каждого сайта: в пул уходят только ссылки сайтов со
+    # свободным слотом, поэтому потоки пула не простаивают в ожидании лимита
+    queues: dict[str, deque[str]] = defaultdict(deque)
+    for url in urls:
+        queues[domain(url)].append(url)
+    active: Counter[str] = Counter()
+    running: dict[Future[None], str] = {}
+
+    def dispatch(pool: ThreadPoolExecutor) -> None:
+        # По одной ссылке с сайта за проход, пока есть свободные потоки
+        submitted = True
+        while submitted and len(running) < args.workers:
+            submitted = False
+            for site, queue in queues.items():
+                if len(running) >= args.workers:
+                    break
+                if queue and active[site] < args.per_domain:
+                    url = queue.popleft()
+                    active[site] += 1
+                    running[pool.submit(download_one, url, options, progress)] = url
+                    submitted = True
+
+    stop = threading.Event()
+
+    def reporter() -> None:
+        while not stop.wait(REPORT_INTERVAL):
+            print(progress.report(), file=sys.stderr)
+
+    threading.Thread(target=reporter, daemon=True).start()
+    try:
+        with ThreadPoolExecutor(max_workers=args.workers) as pool:
+            dispatch(pool)
+            while running:
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    url = running.pop(future)
+                    active[domain(url)] -= 1
+                    try:
+                        future.result()
+                    except Exception as e:
+                        progress.finish("failed")
+                        print(f"Не удалось скачать {url}: {e}", file=sys.stderr)
+                dispatch(pool)
+    finally:
+        stop.set()
+    print(progress.report(), file=sys.stderr)
+    return 1 if progress.failed else 0
+
+
+def main() -> int:
+    args = parse_args()
+    urls = read_urls(args)
+    if not urls:
+        print("Нет ссылок для скачивания", file=sys.stderr)
+        return 2
+
+    output = Path(args.output)
+    options = {
+        "outtmpl": str(output / "%(title)s.%(ext)s"),
+        "format": FORMAT,
+        # Докачивать .part файлы вместо загрузки заново
+        "continuedl": True,
     }
-    with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-        ydl.download([sys.argv[1]])
+    if args.fragments:
+        options["concurrent_fragment_downloads"] = args.fragments
+    if args.archive and not args.no_archive:
+        options["download_archive"] = args.archive
+
+    if len(urls) == 1 and not args.file:
+        # Одна ссылка - как раньше: обычный вывод yt-dlp
+        with yt_dlp.YoutubeDL(options) as ydl:
+            return ydl.download(urls)
+
+    options.setdefault("concurrent_fragment_downloads", BATCH_FRAGMENTS)
+    if not args.no_archive and not args.archive:
+        output.mkdir(parents=True, exist_ok=True)
+        options["download_archive"] = str(output / "archive.txt")
+    options.update({"quiet": True, "noprogress": True, "no_warnings": True})
+    return download_batch(urls, options, args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -7,6 +7,7 @@ from sqlalchemy.ext.asyncio import async_engine_from_config
 
 from alembic import context
 from app.config.settings import settings
+from app.migrations import PROGRESS_TABLE
 
 # Import your models and settings
 from app.schemas import *  # noqa: F403
@@ -33,6 +34,11 @@ target_metadata = Base.metadata  # noqa: F405
 config.set_main_option("sqlalchemy.url", settings.DATABASE_URL)
 
 
+def include_name(name, type_, parent_names) -> bool:
+    # Служебная таблица прогресса backfill не описана в моделях
+    return not (type_ == "table" and name == PROGRESS_TABLE)
+
+
 def run_migrations_offline() -> None:
     """Run migrations in 'offline' mode.
 
@@ -51,6 +57,7 @@ def run_migrations_offline() -> None:
         target_metadata=target_metadata,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
+        include_name=include_name,
     )
 
     with context.begin_transaction():
@@ -58,7 +65,11 @@ def run_migrations_offline() -> None:
 
 
 def do_run_migrations(connection: Connection) -> None:
-    context.configure(connection=connection, target_metadata=target_metadata)
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        include_name=include_name,
+    )
 
     with context.begin_transaction():
         context.run_migrations()
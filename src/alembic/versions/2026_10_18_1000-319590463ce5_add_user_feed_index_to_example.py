@@ -0,0 +1,44 @@
+"""add (user_id, created_at, id) index to example table
+
+Revision ID: 319590463ce5
+Revises: 34fcf60027e9
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '319590463ce5'
+down_revision: Union[str, None] = '34fcf60027e9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY не блокирует запись в таблицу, но не работает внутри
+    # транзакции - выполняем в autocommit. Если построение прервется,
+    # останется невалидный индекс: удалите его и запустите миграцию снова.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_example_user_id_created_at_id',
+            'example',
+            ['user_id', 'created_at', 'id'],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_example_user_id_created_at_id',
+            table_name='example',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
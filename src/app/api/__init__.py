@@ -1,10 +1,17 @@
 from fastapi import APIRouter
 
+from app.config.settings import settings
+
 from .auth import router as auth_router
 from .example import router as example_router
+from .metrics import router as metrics_router
+from .system import router as system_router
 
 api_router = APIRouter()
 api_router.include_router(example_router, prefix="/examples", tags=["examples"])
 api_router.include_router(auth_router, prefix="/auth", tags=["auth"])
+api_router.include_router(system_router, prefix="/system", tags=["system"])
+if settings.METRICS_ENABLED:
+    api_router.include_router(metrics_router, tags=["system"])
 
 __all__ = ["api_router"]
@@ -2,9 +2,11 @@ import logging
 
 from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from pydantic import BaseModel
-from supabase import Client
+from supabase_auth import AsyncGoTrueClient
 
-from app.config.supabase_client import supabase_client
+from app.config.supabase_client import get_login_auth_client
+from app.dto.auth import AuthUserDTO
+from app.services.auth import AuthService
 
 router = APIRouter()
 
@@ -16,23 +18,18 @@ class LoginRequest(BaseModel):
     password: str
 
 
-def get_supabase_client() -> Client:
-    """Возвращает единый экземпляр клиента Supabase."""
-    return supabase_client
-
-
 @router.post("/login")
-def login(
+async def login(
     response: Response,
     login_data: LoginRequest,
-    client: Client = Depends(get_supabase_client),
+    client: AsyncGoTrueClient = Depends(get_login_auth_client),
 ):
     """
     Аутентифицирует пользователя с кредами из настроек и устанавливает
     HttpOnly cookie с access_token.
     """
     try:
-        auth_response = client.auth.sign_in_with_password(
+        auth_response = await client.sign_in_with_password(
             {
                 "email": login_data.email,
                 "password": login_data.password,
@@ -56,16 +53,13 @@ def login(
         return {"status": "ok", "message": "Успешный вход."}
 
     except Exception as e:
-        logging.error(f"Ошибка при входе через Supabase: {e}")
+        logging.error("Ошибка при входе через Supabase: %s", e)
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, detail=f"Ошибка Supabase: {str(e)}"
         )
 
 
-def get_current_user(
-    request: Request,
-    client: Client = Depends(get_supabase_client),
-) -> dict:
+async def get_current_user(request: Request) -> dict:
     """
     Зависимость для проверки токена из cookie и получения данных пользователя.
     """
@@ -76,18 +70,18 @@ def get_current_user(
             detail="Токен доступа отсутствует.",
         )
     try:
-        user_response = client.auth.get_user(jwt=token)
-        if not user_response or not user_response.user:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Не удалось получить пользователя по токену.",
-            )
-        return user_response.user.model_dump()
+        user = await AuthService.get_user(token)
     except Exception:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Токен невалиден или истек.",
         )
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Не удалось получить пользователя по токену.",
+        )
+    return user.model_dump()
 
 
 def require_user(request: Request) -> dict:
@@ -103,6 +97,17 @@ def require_user(request: Request) -> dict:
     return request.state.user
 
 
+def require_auth_user(request: Request) -> AuthUserDTO:
+    """Как require_user, но возвращает AuthUserDTO (с id пользователя)."""
+    user = getattr(request.state, "auth_user", None)
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Необходима аутентификация",
+        )
+    return user
+
+
 @router.get("/me")
 def me(current_user: dict = Depends(require_user)):
     """
@@ -112,10 +117,13 @@ def me(current_user: dict = Depends(require_user)):
 
 
 @router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
-def logout(response: Response):
+def logout(request: Request, response: Response):
     """
     Удаляет cookie аутентификации, завершая сессию пользователя.
     """
+    token = request.cookies.get(ACCESS_COOKIE_NAME)
+    if token:
+        AuthService.invalidate(token)
     response.delete_cookie(
         key=ACCESS_COOKIE_NAME,
         path="/",
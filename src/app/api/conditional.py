@@ -0,0 +1,86 @@
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+
+from fastapi import Request, Response
+
+
+class Validators:
+    """
+    Валидаторы представления ресурса для условных GET запросов:
+    слабый ETag и Last-Modified (если известно время изменения).
+    """
+
+    def __init__(self, etag: str, last_modified: datetime | None = None):
+        self.etag = etag
+        # HTTP дата с точностью до секунды
+        self.last_modified = (
+            last_modified.astimezone(timezone.utc).replace(microsecond=0)
+            if last_modified is not None
+            else None
+        )
+
+    @classmethod
+    def from_version(cls, count: int, modified_at: datetime | None) -> "Validators":
+        """Валидаторы по числу строк и max(modified_at) таблицы."""
+        stamp = modified_at.timestamp() if modified_at is not None else 0
+        return cls(f'W/"{count}-{stamp:.6f}"', modified_at)
+
+    def headers(self) -> dict[str, str]:
+        headers = {
+            "ETag": self.etag,
+            # Клиент может хранить ответ, но должен перепроверять его каждый раз
+            "Cache-Control": "no-cache",
+        }
+        if self.last_modified is not None:
+            headers["Last-Modified"] = format_datetime(self.last_modified, usegmt=True)
+        return headers
+
+    def apply(self, response: Response) -> Response:
+        response.headers.update(self.headers())
+        return response
+
+    @staticmethod
+    def is_conditional(request: Request) -> bool:
+        """Есть ли в запросе If-None-Match или If-Modified-Since."""
+        return (
+            "if-none-match" in request.headers or "if-modified-since" in request.headers
+        )
+
+    def not_modified(self, request: Request) -> bool:
+        """
+        Совпадает ли представление у клиента с текущим (RFC 9110, 13.2.2):
+        If-None-Match важнее If-Modified-Since, если переданы оба.
+        """
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match is not None:
+            return _etag_matches(if_none_match, self.etag)
+
+        if_modified_since = request.headers.get("if-modified-since")
+        if if_modified_since is None or self.last_modified is None:
+            return False
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        # HTTP дата - с точностью до секунды, поэтому обе стороны сравниваются
+        # в целых секундах: клиент, вернувший полученный Last-Modified,
+        # получает 304. Изменение в ту же секунду так не заметить - точная
+        # проверка по ETag (If-None-Match), он важнее
+        return self.last_modified <= since.replace(microsecond=0)
+
+    def not_modified_response(self) -> Response:
+        return Response(status_code=304, headers=self.headers())
+
+
+def _opaque(etag: str) -> str:
+    # Слабое сравнение: W/ не учитывается
+    return etag.removeprefix("W/")
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    if header.strip() == "*":
+        return True
+    current = _opaque(etag)
+    return any(_opaque(tag.strip()) == current for tag in header.split(","))
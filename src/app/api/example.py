@@ -1,18 +1,190 @@
-from fastapi import APIRouter
+import csv
+import io
+from datetime import datetime
+from typing import AsyncGenerator, AsyncIterator, Literal
 
-from app.dto.example import ExampleCreateDTO, ExampleDTO
+from fastapi import APIRouter, Depends, Query, Request
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter, ValidationError
+
+from app.api.auth import require_auth_user
+from app.api.conditional import Validators
+from app.api.pagination import decode_cursor, encode_cursor
+from app.api.responses import DTOJSONResponse
+from app.config.settings import settings
+from app.dto.auth import AuthUserDTO
+from app.dto.example import (
+    ExampleBulkResultDTO,
+    ExampleCreateDTO,
+    ExampleDTO,
+    ExamplePageDTO,
+)
 from app.services.example import ExampleService
 
-router = APIRouter()
+# DTO из сервисов уже провалидированы: отдаем их через DTOJSONResponse
+router = APIRouter(default_response_class=DTOJSONResponse)
+
+EXPORT_CSV_FIELDS = list(ExampleDTO.model_fields)
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+# Ключ keyset пагинации ленты: (created_at, id) последней записи страницы
+ExampleCursor = tuple[datetime, int]
+MAX_PAGE_SIZE = 200
+
+_create_list_adapter = TypeAdapter(list[ExampleCreateDTO])
+
+
+async def _parse_ndjson(request: Request) -> AsyncIterator[ExampleCreateDTO]:
+    """Разбирает тело NDJSON построчно по мере поступления."""
+    buffer = b""
+    line_number = 0
+    async for chunk in request.stream():
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            line_number += 1
+            if line.strip():
+                yield _validate_ndjson_line(line, line_number)
+    if buffer.strip():
+        yield _validate_ndjson_line(buffer, line_number + 1)
+
+
+def _validate_ndjson_line(line: bytes, line_number: int) -> ExampleCreateDTO:
+    try:
+        return ExampleCreateDTO.model_validate_json(line)
+    except ValidationError as e:
+        raise RequestValidationError(e.errors(), body=f"line {line_number}")
+
+
+async def _prefetch(
+    batches: AsyncGenerator[list[ExampleDTO], None],
+) -> AsyncIterator[list[ExampleDTO]]:
+    """
+    Открывает выгрузку и читает первую пачку до отправки статуса и заголовков:
+    перегрузка, недоступная БД или ошибка запроса дают обычный ответ
+    с ошибкой, а не обрезанное тело с кодом 200.
+    """
+    first = await anext(batches, None)
+
+    async def rest() -> AsyncIterator[list[ExampleDTO]]:
+        try:
+            if first is not None:
+                yield first
+                async for batch in batches:
+                    yield batch
+        finally:
+            # Транзакция закрывается и при обрыве соединения клиентом
+            await batches.aclose()
+
+    return rest()
+
+
+async def _ndjson_chunks(
+    batches: AsyncIterator[list[ExampleDTO]],
+) -> AsyncIterator[bytes]:
+    async for batch in batches:
+        yield b"".join(dto.model_dump_json().encode() + b"\n" for dto in batch)
+
+
+async def _csv_chunks(batches: AsyncIterator[list[ExampleDTO]]) -> AsyncIterator[str]:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_CSV_FIELDS)
+    writer.writeheader()
+    # Заголовок отдельным куском: пустая таблица - CSV из одной строки заголовка
+    yield buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate()
+    async for batch in batches:
+        writer.writerows(dto.model_dump(mode="json") for dto in batch)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
 
 
 @router.post("/", response_model=ExampleDTO)
 async def create_example(data: ExampleCreateDTO):
     """Создание новой записи Example"""
-    return await ExampleService.create(data)
+    return DTOJSONResponse(await ExampleService.create(data))
+
+
+@router.post(
+    "/bulk",
+    response_model=ExampleBulkResultDTO,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {
+                    "schema": {
+                        "type": "array",
+                        "items": {"$ref": "#/components/schemas/ExampleCreateDTO"},
+                    }
+                },
+                NDJSON_MEDIA_TYPE: {"schema": {"type": "string"}},
+            },
+        }
+    },
+)
+async def bulk_create_examples(request: Request):
+    """Массовое создание записей Example из JSON массива или потока NDJSON"""
+    if request.headers.get("content-type", "").startswith(NDJSON_MEDIA_TYPE):
+        created = await ExampleService.bulk_create_stream(_parse_ndjson(request))
+    else:
+        try:
+            examples = _create_list_adapter.validate_json(await request.body())
+        except ValidationError as e:
+            raise RequestValidationError(e.errors())
+        created = await ExampleService.bulk_create(examples)
+    return DTOJSONResponse(ExampleBulkResultDTO(created=created))
+
+
+@router.get(
+    "/",
+    response_model=list[ExampleDTO],
+    responses={304: {"description": "Список не изменился (ETag/Last-Modified)"}},
+)
+async def get_examples(request: Request):
+    """
+    Получение всех записей Example.
+    Поддерживает If-None-Match и If-Modified-Since: если список не менялся,
+    отвечает 304, не загружая записи.
+    """
+    if Validators.is_conditional(request):
+        validators = Validators.from_version(*await ExampleService.get_version())
+        if validators.not_modified(request):
+            return validators.not_modified_response()
+    # Версия и записи - из одного снимка и одной записи кэша
+    version, examples = await ExampleService.get_all_versioned()
+    return Validators.from_version(*version).apply(DTOJSONResponse(examples))
+
+
+@router.get("/mine", response_model=ExamplePageDTO)
+async def get_my_examples(
+    cursor: str | None = None,
+    limit: int = Query(50, ge=1, le=MAX_PAGE_SIZE),
+    user: AuthUserDTO = Depends(require_auth_user),
+):
+    """
+    Записи текущего пользователя, новые первыми, страницами по limit.
+    Следующая страница - с cursor из next_cursor предыдущей.
+    """
+    after = decode_cursor(cursor, ExampleCursor) if cursor else None
+    examples, has_more = await ExampleService.get_user_page(user.id, after, limit)
+    next_cursor = None
+    if has_more:
+        last = examples[-1]
+        next_cursor = encode_cursor((last.created_at, last.id))
+    return DTOJSONResponse(ExamplePageDTO(items=examples, next_cursor=next_cursor))
 
 
-@router.get("/", response_model=list[ExampleDTO])
-async def get_examples():
-    """Получение всех записей Example"""
-    return await ExampleService.get_all()
+@router.get("/export")
+async def export_examples(format: Literal["ndjson", "csv"] = "ndjson"):
+    """Потоковая выгрузка всех записей Example в NDJSON или CSV"""
+    batches = await _prefetch(ExampleService.export_all(settings.EXPORT_FETCH_SIZE))
+    if format == "csv":
+        return StreamingResponse(
+            _csv_chunks(batches),
+            media_type="text/csv",
+            headers={"Content-Disposition": 'attachment; filename="examples.csv"'},
+        )
+    return StreamingResponse(_ndjson_chunks(batches), media_type=NDJSON_MEDIA_TYPE)
@@ -0,0 +1,33 @@
+import base64
+import binascii
+from functools import cache
+from typing import Any
+
+from fastapi import HTTPException, status
+from pydantic import TypeAdapter, ValidationError
+from pydantic_core import to_json
+
+
+@cache
+def _adapter(cursor_type: Any) -> TypeAdapter[Any]:
+    return TypeAdapter(cursor_type)
+
+
+def encode_cursor(values: tuple[Any, ...]) -> str:
+    """
+    Непрозрачный курсор keyset пагинации: значения ключа последней записи
+    страницы в JSON, закодированные base64url без выравнивания.
+    """
+    return base64.urlsafe_b64encode(to_json(values)).rstrip(b"=").decode("ascii")
+
+
+def decode_cursor(cursor: str, cursor_type: Any) -> Any:
+    """Разбирает курсор в cursor_type (например, tuple[datetime, int]) или 400."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        return _adapter(cursor_type).validate_json(raw)
+    except (binascii.Error, ValueError, ValidationError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Некорректный курсор",
+        ) from None
@@ -0,0 +1,30 @@
+from functools import cache
+from typing import Any
+
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+from app.dto.base import BaseDTO
+
+
+@cache
+def _list_adapter(dto_class: type[BaseDTO]) -> TypeAdapter[list[Any]]:
+    return TypeAdapter(list[dto_class])  # type: ignore[valid-type]
+
+
+class DTOJSONResponse(JSONResponse):
+    """
+    JSON ответ, который сериализует DTO сразу в байты через pydantic-core.
+
+    DTO уже провалидированы при создании в DAO, поэтому эндпоинт, который
+    возвращает этот ответ напрямую, пропускает повторную валидацию по
+    response_model и jsonable_encoder. Списки должны состоять из DTO одного
+    класса. Остальное содержимое сериализуется как в JSONResponse.
+    """
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, BaseDTO):
+            return content.__pydantic_serializer__.to_json(content)
+        if isinstance(content, list) and content and isinstance(content[0], BaseDTO):
+            return _list_adapter(type(content[0])).dump_json(content)
+        return super().render(content)
@@ -0,0 +1,56 @@
+import asyncio
+import contextlib
+
+from fastapi import APIRouter, Depends
+from fastapi.responses import JSONResponse
+
+from app.api.auth import require_user
+from app.cache import cache_stats
+from app.config import db
+from app.config.supabase_client import get_supabase_auth
+from app.middlewares.in_flight import request_tracker
+
+router = APIRouter()
+
+# Сколько секунд проверка готовности ждет повторного прогрева пула
+READY_WARMUP_TIMEOUT = 5.0
+
+
+@router.get("/cache")
+async def get_cache_stats(_: dict = Depends(require_user)):
+    """Статистика in-process кэшей: размер, попадания, промахи, вытеснения."""
+    return cache_stats()
+
+
+@router.get("/ready")
+async def get_readiness():
+    """
+    Готовность принимать трафик (для балансировщика): пул соединений
+    прогрет, клиент Supabase создан и приложение не останавливается.
+    """
+    if db.engine is not None and not db.is_db_ready() and not request_tracker.draining:
+        # Прогрев при старте не удался (например, БД была недоступна) - повторяем
+        with contextlib.suppress(Exception):
+            await asyncio.wait_for(db.warm_up_pool(), READY_WARMUP_TIMEOUT)
+    checks = {
+        "database": db.is_db_ready(),
+        "supabase": _supabase_ready(),
+        "draining": request_tracker.draining,
+    }
+    ready = checks["database"] and checks["supabase"] and not checks["draining"]
+    return JSONResponse(
+        {
+            "status": "ready" if ready else "not_ready",
+            **checks,
+            "in_flight": request_tracker.in_flight,
+        },
+        status_code=200 if ready else 503,
+    )
+
+
+def _supabase_ready() -> bool:
+    try:
+        get_supabase_auth()
+    except RuntimeError:
+        return False
+    return True
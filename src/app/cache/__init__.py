@@ -0,0 +1,30 @@
+"""
+In-process кэширование.
+"""
+
+from app.cache.backends import CacheBackend, InMemoryCacheBackend
+from app.cache.decorators import (
+    cached,
+    get_cache_backend,
+    invalidate,
+    invalidates,
+    set_cache_backend,
+    single_flight,
+)
+from app.cache.memory import MISSING, TTLCache, cache_stats
+from app.cache.singleflight import SingleFlight
+
+__all__ = [
+    "MISSING",
+    "CacheBackend",
+    "InMemoryCacheBackend",
+    "SingleFlight",
+    "TTLCache",
+    "cache_stats",
+    "cached",
+    "get_cache_backend",
+    "invalidate",
+    "invalidates",
+    "set_cache_backend",
+    "single_flight",
+]
@@ -0,0 +1,50 @@
+from abc import ABC, abstractmethod
+from typing import Any
+
+from app.cache.memory import TTLCache
+
+
+class CacheBackend(ABC):
+    """
+    Хранилище для кэша чтений сервисного слоя.
+
+    Реализация для внешнего хранилища (Redis, Memcached) сама отвечает
+    за сериализацию значений и должна возвращать MISSING при промахе.
+    """
+
+    @abstractmethod
+    async def get(self, key: str) -> Any:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def set(self, key: str, value: Any, ttl: float | None = None) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def delete_prefix(self, prefix: str) -> None:
+        raise NotImplementedError
+
+
+class InMemoryCacheBackend(CacheBackend):
+    """Хранилище в памяти процесса поверх TTLCache (LRU + TTL)."""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl, name="service_reads")
+
+    async def get(self, key: str) -> Any:
+        return self._cache.get(key)
+
+    async def set(self, key: str, value: Any, ttl: float | None = None) -> None:
+        self._cache.set(key, value, ttl)
+
+    async def delete(self, key: str) -> None:
+        self._cache.delete(key)
+
+    async def delete_prefix(self, prefix: str) -> None:
+        for key in self._cache.keys():
+            if isinstance(key, str) and key.startswith(prefix):
+                self._cache.delete(key)
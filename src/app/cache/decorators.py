@@ -0,0 +1,183 @@
+import functools
+from typing import Any, Awaitable, Callable, Hashable, ParamSpec, TypeVar
+
+from app.cache.backends import CacheBackend, InMemoryCacheBackend
+from app.cache.memory import MISSING, register_stats
+from app.cache.singleflight import SingleFlight
+from app.config.db import is_primary_pinned
+from app.config.settings import settings
+
+P = ParamSpec("P")
+T = TypeVar("T")
+
+_backend: CacheBackend = InMemoryCacheBackend(
+    maxsize=settings.CACHE_MAXSIZE,
+    ttl=settings.CACHE_TTL,
+)
+_loads = SingleFlight()
+register_stats("service_loads", _loads)
+_flights = SingleFlight()
+register_stats("service_flights", _flights)
+
+# Поколение пространства имен растет при каждой инвалидации: загрузка,
+# начатая до записи, не положит в кэш устаревшие данные
+_generations: dict[str, int] = {}
+
+
+class NamespaceStats:
+    """Попадания и промахи кэша по пространству имен."""
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def stats(self) -> dict[str, int | float]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
+
+
+_namespaces: dict[str, NamespaceStats] = {}
+
+
+def _namespace_stats(namespace: str) -> NamespaceStats:
+    if namespace not in _namespaces:
+        _namespaces[namespace] = NamespaceStats()
+        register_stats(f"service:{namespace}", _namespaces[namespace])
+    return _namespaces[namespace]
+
+
+def set_cache_backend(backend: CacheBackend) -> None:
+    """Подменяет хранилище кэша (например, на внешнее)."""
+    global _backend
+    _backend = backend
+
+
+def get_cache_backend() -> CacheBackend:
+    return _backend
+
+
+def _args_key(args: tuple, kwargs: dict[str, Any]) -> str:
+    return f"{args!r}:{sorted(kwargs.items())!r}"
+
+
+def _flight_key(
+    fn: Callable, args_key: Hashable, scope: Hashable, namespace: str | None
+) -> tuple:
+    generation = _generations.get(namespace, 0) if namespace else None
+    return (fn.__qualname__, args_key, scope, generation)
+
+
+def cached(
+    namespace: str,
+    ttl: float | None = None,
+    key: Callable[..., Hashable] | None = None,
+) -> Callable[[Callable[P, Awaitable[T]]], Callable[P, Awaitable[T]]]:
+    """
+    Read-through кэш для асинхронного метода сервиса.
+
+    Ключ строится из имени метода и аргументов (или функцией key).
+    Одновременные промахи по одному ключу выполняют один запрос к БД, в том
+    числе при выключенном кэше - отдельный single_flight поверх не нужен.
+    После записи в текущем запросе (read-your-writes) кэш и общие загрузки
+    не используются: чтение идет на primary. Кэшированное значение общее
+    для всех вызывающих - его нельзя изменять.
+    """
+    stats = _namespace_stats(namespace)
+
+    def decorator(fn: Callable[P, Awaitable[T]]) -> Callable[P, Awaitable[T]]:
+        @functools.wraps(fn)
+        async def wrapper(*args: P.args, **kwargs: P.kwargs) -> T:
+            if is_primary_pinned():
+                return await fn(*args, **kwargs)
+            args_key = key(*args, **kwargs) if key else _args_key(args, kwargs)
+            if not settings.CACHE_ENABLED:
+                return await _flights.do(
+                    _flight_key(fn, args_key, None, namespace),
+                    lambda: fn(*args, **kwargs),
+                )
+
+            cache_key = f"{namespace}:{fn.__qualname__}:{args_key}"
+            value = await _backend.get(cache_key)
+            if value is not MISSING:
+                stats.hits += 1
+                return value
+            stats.misses += 1
+
+            generation = _generations.get(namespace, 0)
+
+            async def load() -> T:
+                value = await fn(*args, **kwargs)
+                if _generations.get(namespace, 0) == generation:
+                    await _backend.set(cache_key, value, ttl)
+                return value
+
+            return await _loads.do((cache_key, generation), load)
+
+        return wrapper
+
+    return decorator
+
+
+def single_flight(
+    namespace: str | None = None,
+    key: Callable[..., Hashable] | None = None,
+    scope: Callable[[], Hashable] | None = None,
+) -> Callable[[Callable[P, Awaitable[T]]], Callable[P, Awaitable[T]]]:
+    """
+    Объединяет одновременные одинаковые вызовы метода сервиса в один
+    запрос к БД без кэширования результата - для некэшируемых чтений
+    (@cached сам объединяет промахи). После записи в текущем запросе вызов
+    не присоединяется к чужой загрузке, а читает с primary.
+
+    Ключ - имя метода и аргументы (или функция key). scope добавляет к ключу
+    область видимости, например id текущего пользователя, если результат
+    зависит от него, а не только от аргументов. namespace - пространство
+    имен кэша: после его инвалидации новые вызовы не присоединяются
+    к загрузке, начатой до записи. Результат общий - его нельзя изменять.
+    """
+
+    def decorator(fn: Callable[P, Awaitable[T]]) -> Callable[P, Awaitable[T]]:
+        @functools.wraps(fn)
+        async def wrapper(*args: P.args, **kwargs: P.kwargs) -> T:
+            if is_primary_pinned():
+                return await fn(*args, **kwargs)
+            args_key = key(*args, **kwargs) if key else _args_key(args, kwargs)
+            flight_key = _flight_key(
+                fn, args_key, scope() if scope else None, namespace
+            )
+            return await _flights.do(flight_key, lambda: fn(*args, **kwargs))
+
+        return wrapper
+
+    return decorator
+
+
+def invalidates(
+    *namespaces: str,
+) -> Callable[[Callable[P, Awaitable[T]]], Callable[P, Awaitable[T]]]:
+    """Сбрасывает кэш пространств имен после успешного выполнения метода."""
+
+    def decorator(fn: Callable[P, Awaitable[T]]) -> Callable[P, Awaitable[T]]:
+        @functools.wraps(fn)
+        async def wrapper(*args: P.args, **kwargs: P.kwargs) -> T:
+            result = await fn(*args, **kwargs)
+            for namespace in namespaces:
+                await invalidate(namespace)
+            return result
+
+        return wrapper
+
+    return decorator
+
+
+async def invalidate(namespace: str) -> None:
+    """Сбрасывает все записи пространства имен."""
+    _generations[namespace] = _generations.get(namespace, 0) + 1
+    _namespace_stats(namespace).invalidations += 1
+    await _backend.delete_prefix(f"{namespace}:")
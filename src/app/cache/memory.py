@@ -0,0 +1,93 @@
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Protocol
+
+# Маркер промаха: позволяет хранить в кэше None (например, негативные записи)
+MISSING: Any = object()
+
+# Все именованные кэши процесса - для отдачи статистики
+_registry: dict[str, "SupportsStats"] = {}
+
+
+class SupportsStats(Protocol):
+    def stats(self) -> dict[str, int | float]: ...
+
+
+def register_stats(name: str, source: SupportsStats) -> None:
+    """Регистрирует источник статистики кэша под именем name."""
+    _registry[name] = source
+
+
+class TTLCache:
+    """
+    In-process LRU кэш с временем жизни записей.
+
+    Каждая запись живет до своего expires_at; при превышении maxsize
+    вытесняется давно не использованная запись. Не потокобезопасен -
+    рассчитан на использование из одного event loop.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, name: str | None = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.name = name
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        if name is not None:
+            register_stats(name, self)
+
+    def get(self, key: Hashable) -> Any:
+        """Возвращает значение или MISSING, если записи нет или она истекла."""
+        item = self._data.get(key)
+        if item is None:
+            self.misses += 1
+            return MISSING
+        expires_at, value = item
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            self.misses += 1
+            return MISSING
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: float | None = None) -> None:
+        """Сохраняет значение на ttl секунд (по умолчанию - на ttl кэша)."""
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        if ttl <= 0 or self.maxsize <= 0:
+            return
+        self._data[key] = (time.monotonic() + ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def delete(self, key: Hashable) -> None:
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def keys(self) -> list[Hashable]:
+        return list(self._data)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> dict[str, int | float]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
+
+
+def cache_stats() -> dict[str, dict[str, int | float]]:
+    """Статистика всех именованных кэшей процесса."""
+    return {name: source.stats() for name, source in _registry.items()}
@@ -0,0 +1,112 @@
+import asyncio
+import time
+from collections import deque
+from contextvars import ContextVar
+
+from app.config.settings import settings
+
+# Крайний срок ожидания допуска к БД для текущего HTTP запроса (monotonic)
+_deadline: ContextVar[float | None] = ContextVar("admission_deadline", default=None)
+
+
+class ServiceOverloadedError(Exception):
+    """Нет свободных соединений к БД и очередь ожидания полна или истек срок."""
+
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def start_request_deadline() -> None:
+    """Отсчитывает DB_ADMISSION_TIMEOUT от начала текущего запроса."""
+    _deadline.set(time.monotonic() + settings.DB_ADMISSION_TIMEOUT)
+
+
+class AdmissionController:
+    """
+    Допуск к пулу соединений: не больше capacity одновременных Unit of Work,
+    остальные ждут в ограниченной очереди до крайнего срока запроса.
+    Записи, если включен приоритет, обслуживаются раньше чтений.
+    Переполнение очереди и истекший срок - ServiceOverloadedError (503),
+    вместо ожидания соединения до pool_timeout.
+    """
+
+    def __init__(
+        self,
+        capacity: int,
+        max_queue: int,
+        timeout: float,
+        write_priority: bool = True,
+        retry_after: int = 1,
+    ):
+        self.capacity = capacity
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.write_priority = write_priority
+        self.retry_after = retry_after
+        self.in_use = 0
+        self.rejected = 0
+        self._writes: deque[asyncio.Future[None]] = deque()
+        self._reads: deque[asyncio.Future[None]] = deque()
+
+    @property
+    def queued(self) -> int:
+        return len(self._writes) + len(self._reads)
+
+    def _overloaded(self, reason: str) -> ServiceOverloadedError:
+        self.rejected += 1
+        return ServiceOverloadedError(reason, self.retry_after)
+
+    def _remaining(self) -> float:
+        deadline = _deadline.get()
+        if deadline is None:
+            return self.timeout
+        return min(self.timeout, deadline - time.monotonic())
+
+    async def acquire(self, write: bool = False) -> None:
+        if self.in_use < self.capacity and not self.queued:
+            self.in_use += 1
+            return
+        if self.queued >= self.max_queue:
+            raise self._overloaded("Очередь к базе данных переполнена")
+        remaining = self._remaining()
+        if remaining <= 0:
+            raise self._overloaded("Истек срок ожидания соединения с базой данных")
+
+        waiter: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        queue = self._writes if write and self.write_priority else self._reads
+        queue.append(waiter)
+        try:
+            async with asyncio.timeout(remaining):
+                await waiter
+        except BaseException as e:
+            if waiter.done() and not waiter.cancelled():
+                # Место уже передано нам - отдаем его следующему
+                self.release()
+            else:
+                waiter.cancel()
+                if waiter in queue:
+                    queue.remove(waiter)
+            if isinstance(e, TimeoutError):
+                raise self._overloaded(
+                    "Истек срок ожидания соединения с базой данных"
+                ) from None
+            raise
+
+    def release(self) -> None:
+        # Место переходит первому ожидающему, не освобождаясь
+        for queue in (self._writes, self._reads):
+            while queue:
+                waiter = queue.popleft()
+                if not waiter.done():
+                    waiter.set_result(None)
+                    return
+        self.in_use -= 1
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "capacity": self.capacity,
+            "in_use": self.in_use,
+            "queued": self.queued,
+            "rejected": self.rejected,
+        }
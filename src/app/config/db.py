@@ -1,33 +1,239 @@
+import asyncio
 import logging
+import time
 from contextlib import AbstractAsyncContextManager
-from typing import Any, AsyncGenerator, Callable
+from contextvars import ContextVar
+from typing import Any, AsyncGenerator, Callable, Iterable
 
+from sqlalchemy import make_url
+from sqlalchemy.exc import DBAPIError, InterfaceError, OperationalError
 from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
     AsyncSession,
     async_sessionmaker,
     create_async_engine,
 )
 
+from app.config.admission import AdmissionController
 from app.config.settings import settings
+from app.metrics import GaugeCallback, TimedAsyncQueuePool, instrument_engine
+from app.metrics.profiler import install_query_profiler
 
 from .uow import IUnitOfWork  # type: ignore
 
 SessionFactory = Callable[..., AbstractAsyncContextManager[AsyncSession]]
 
-# Создаём движок один раз с фиксированным пулом
-engine = create_async_engine(
-    settings.DATABASE_URL,
-    pool_size=5,  # Максимум 5 соединений
-    max_overflow=0,  # Не создавать дополнительные соединения
-    pool_timeout=30,  # Таймаут ожидания соединения
-    pool_pre_ping=True,  # Проверять соединение перед использованием
-    echo=False,  # Отключить SQL-лог
+
+# Порт пулера Supabase в transaction mode
+TRANSACTION_POOLER_PORT = 6543
+
+
+def uses_prepared_statements(url: str) -> bool:
+    """
+    Можно ли включать серверные prepared statements для этого URL.
+    Пулер в transaction mode отдает каждую транзакцию на любое серверное
+    соединение, и подготовленные ранее запросы там не найдутся.
+    """
+    if settings.DB_STATEMENT_CACHE != "auto":
+        return settings.DB_STATEMENT_CACHE == "prepared"
+    return make_url(url).port != TRANSACTION_POOLER_PORT
+
+
+def pool_size() -> int:
+    """
+    Размер пула одного процесса: общий лимит DB_MAX_CONNECTIONS делится
+    между WEB_CONCURRENCY воркерами, чтобы все вместе не превысили его.
+    """
+    return max(1, settings.DB_MAX_CONNECTIONS // max(1, settings.WEB_CONCURRENCY))
+
+
+def _create_admission(engine: AsyncEngine) -> AdmissionController:
+    return AdmissionController(
+        capacity=engine.pool.size() + settings.DB_MAX_OVERFLOW,
+        max_queue=settings.DB_ADMISSION_QUEUE,
+        timeout=settings.DB_ADMISSION_TIMEOUT,
+        write_priority=settings.DB_ADMISSION_WRITE_PRIORITY,
+        retry_after=settings.DB_ADMISSION_RETRY_AFTER,
+    )
+
+
+def _create_engine(url: str, name: str = "primary") -> AsyncEngine:
+    """name - метка движка в метриках (primary, replica-0, ...)."""
+    prepare_threshold = (
+        settings.DB_PREPARE_THRESHOLD if uses_prepared_statements(url) else None
+    )
+    engine = create_async_engine(
+        url,
+        pool_size=pool_size(),  # Доля процесса в общем лимите соединений
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,  # Таймаут ожидания соединения
+        pool_pre_ping=True,  # Проверять соединение перед использованием
+        echo=False,  # Отключить SQL-лог
+        # None отключает prepared statements в psycopg
+        connect_args={"prepare_threshold": prepare_threshold},
+        query_cache_size=settings.DB_COMPILED_CACHE_SIZE,
+        # Пул с замером ожидания соединения; имя попадает в метки метрик
+        poolclass=TimedAsyncQueuePool,
+        pool_logging_name=name,
+    )
+    if settings.METRICS_ENABLED:
+        instrument_engine(engine, name)
+    install_query_profiler(engine)
+    return engine
+
+
+# Движок primary и движки реплик только для чтения (могут отсутствовать).
+# Создаются в lifespan приложения (init_db) и закрываются при остановке.
+engine: AsyncEngine | None = None
+replica_engines: list[AsyncEngine] = []
+# Допуск к пулу каждого движка (если включен DB_ADMISSION_ENABLED)
+_admission: dict[AsyncEngine, AdmissionController] = {}
+# Пул прогрет - приложение готово принимать трафик
+_pool_warm = False
+
+
+class ReplicaRouter:
+    """
+    Выбирает реплику для чтения по кругу (round-robin).
+    Реплика с ошибкой соединения исключается из ротации на eject_seconds.
+    """
+
+    def __init__(self, engines: list[AsyncEngine], eject_seconds: float):
+        self._engines = engines
+        self._eject_seconds = eject_seconds
+        self._next = 0
+        self._down_until: dict[int, float] = {}
+
+    def choose(self) -> AsyncEngine | None:
+        """Следующая живая реплика или None, если живых нет."""
+        now = time.monotonic()
+        for _ in range(len(self._engines)):
+            index = self._next % len(self._engines)
+            self._next += 1
+            if self._down_until.get(index, 0.0) <= now:
+                return self._engines[index]
+        return None
+
+    def is_replica(self, engine: AsyncEngine) -> bool:
+        return any(engine is replica for replica in self._engines)
+
+    def mark_down(self, engine: AsyncEngine) -> None:
+        for index, replica in enumerate(self._engines):
+            if replica is engine:
+                self._down_until[index] = time.monotonic() + self._eject_seconds
+                logging.warning(
+                    "Реплика %s исключена из ротации на %s с",
+                    replica.url.render_as_string(hide_password=True),
+                    self._eject_seconds,
+                )
+
+
+replica_router = ReplicaRouter([], settings.DATABASE_REPLICA_EJECT_SECONDS)
+
+
+def get_engine() -> AsyncEngine:
+    """Возвращает движок primary."""
+    if engine is None:
+        raise RuntimeError("Database engine is not initialized")
+    return engine
+
+
+async def init_db(warm_connections: int | None = None) -> None:
+    """
+    Создает движки и прогревает пул primary. Ошибка прогрева не мешает
+    старту: приложение поднимется неготовым, прогрев повторит /system/ready.
+    """
+    global engine, replica_engines, replica_router
+    if engine is not None:
+        return
+    engine = _create_engine(settings.DATABASE_URL)
+    replica_engines = [
+        _create_engine(url, f"replica-{index}")
+        for index, url in enumerate(settings.DATABASE_REPLICA_URLS)
+    ]
+    replica_router = ReplicaRouter(
+        replica_engines, settings.DATABASE_REPLICA_EJECT_SECONDS
+    )
+    if settings.DB_ADMISSION_ENABLED:
+        for current in [engine, *replica_engines]:
+            _admission[current] = _create_admission(current)
+    try:
+        await warm_up_pool(warm_connections)
+    except Exception as e:
+        logging.warning("Не удалось прогреть пул соединений: %s", e)
+
+
+async def warm_up_pool(connections: int | None = None) -> None:
+    """
+    Открывает connections соединений одновременно и возвращает их в пул,
+    чтобы первые запросы не платили за установку соединения.
+    """
+    global _pool_warm
+    primary = get_engine()
+    if connections is None:
+        connections = settings.DB_POOL_WARMUP
+    connections = min(connections, primary.pool.size())
+    opened = await asyncio.gather(
+        *(primary.connect() for _ in range(connections)), return_exceptions=True
+    )
+    errors = [c for c in opened if isinstance(c, BaseException)]
+    for connection in opened:
+        if not isinstance(connection, BaseException):
+            await connection.close()
+    if errors:
+        raise errors[0]
+    _pool_warm = True
+
+
+def is_db_ready() -> bool:
+    return engine is not None and _pool_warm
+
+
+async def dispose_db() -> None:
+    """Закрывает все соединения пулов primary и реплик."""
+    global engine, replica_engines, replica_router, _pool_warm
+    for current in [engine, *replica_engines]:
+        if current is not None:
+            await current.dispose()
+    engine = None
+    replica_engines = []
+    replica_router = ReplicaRouter([], settings.DATABASE_REPLICA_EJECT_SECONDS)
+    _admission.clear()
+    _pool_warm = False
+
+
+def _admission_stats() -> Iterable[tuple[tuple[str, ...], float]]:
+    for current, controller in _admission.items():
+        name = current.pool.logging_name or "default"
+        for state, value in controller.stats().items():
+            yield (name, state), value
+
+
+DB_ADMISSION = GaugeCallback(
+    "db_admission",
+    "Допуск к пулу: capacity, in_use, queued и rejected (всего отказов).",
+    _admission_stats,
+    ["engine", "state"],
 )
 
 
-# Создаём фабрику сессий один раз
+# Read-your-writes: после записи чтения в том же запросе идут на primary.
+# Контекст у каждого запроса свой, поэтому флаг не протекает между запросами.
+_primary_pinned: ContextVar[bool] = ContextVar("primary_pinned", default=False)
+
+
+def pin_to_primary() -> None:
+    """Направляет последующие чтения текущего запроса на primary."""
+    _primary_pinned.set(True)
+
+
+def is_primary_pinned() -> bool:
+    """Была ли в текущем запросе запись: тогда чтения идут мимо кэша."""
+    return _primary_pinned.get()
+
+
+# Создаём фабрику сессий один раз; движок передается при открытии сессии
 async_session_factory = async_sessionmaker(
-    engine,
     class_=AsyncSession,
     expire_on_commit=False,
     autocommit=False,
@@ -37,41 +243,76 @@ async_session_factory = async_sessionmaker(
 
 # Зависимость FastAPI для получения сессии
 async def get_session() -> AsyncGenerator[AsyncSession, Any]:
-    async with async_session_factory() as session:
+    async with async_session_factory(bind=get_engine()) as session:
         yield session
 
 
-def get_db_session() -> AsyncSession:
-    return async_session_factory()
+def get_db_session(bind: AsyncEngine | None = None) -> AsyncSession:
+    return async_session_factory(bind=bind or get_engine())
+
+
+def _is_connection_error(exc: BaseException | None) -> bool:
+    if isinstance(exc, (OperationalError, InterfaceError)):
+        return True
+    return isinstance(exc, DBAPIError) and exc.connection_invalidated
 
 
 class SqlAlchemyUnitOfWork(IUnitOfWork):
-    def __init__(self):
+    def __init__(self, read_only: bool = False):
+        """
+        read_only=True - только чтение: сессия открывается на реплике,
+        если реплики настроены и в этом запросе еще не было записи.
+        """
         self._session_factory = get_db_session
         self._session: AsyncSession | None = None
+        self._read_only = read_only
+        self._engine: AsyncEngine | None = None
+        self._admission: AdmissionController | None = None
 
     def _ensure_session(self) -> AsyncSession:
         if self._session is None:
             raise RuntimeError("Session is not initialized")
         return self._session
 
+    def _choose_engine(self) -> AsyncEngine:
+        if self._read_only and not _primary_pinned.get():
+            return replica_router.choose() or get_engine()
+        return get_engine()
+
     async def __aenter__(self):
-        self._session = self._session_factory()
+        self._engine = self._choose_engine()
+        admission = _admission.get(self._engine)
+        if admission is not None:
+            # Ждем места в пуле не дольше срока запроса, иначе 503
+            await admission.acquire(write=not self._read_only)
+            self._admission = admission
+        self._session = self._session_factory(self._engine)
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        if exc_type is not None:
-            await self.rollback()
-            logging.error(f"Exception in UnitOfWork: {exc_val}")
+        try:
+            if exc_type is not None:
+                await self.rollback()
+                logging.error("Exception in UnitOfWork: %s", exc_val)
+                session = self._ensure_session()
+                await session.close()
+                if _is_connection_error(exc_val) and replica_router.is_replica(
+                    self._engine
+                ):
+                    replica_router.mark_down(self._engine)
+                raise exc_val
             session = self._ensure_session()
             await session.close()
-            raise exc_val
-        session = self._ensure_session()
-        await session.close()
+        finally:
+            if self._admission is not None:
+                self._admission.release()
+                self._admission = None
 
     async def commit(self):
         session = self._ensure_session()
         await session.commit()
+        if not self._read_only:
+            pin_to_primary()
 
     async def rollback(self):
         session = self._ensure_session()
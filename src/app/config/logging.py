@@ -1,4 +1,19 @@
+import atexit
+import copy
+import json
 import logging
+import queue
+import random
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+from app.config.settings import settings
+
+# ID текущего HTTP запроса; выставляется RequestIdMiddleware
+request_id_var: ContextVar[str | None] = ContextVar("request_id", default=None)
+
+_listener: QueueListener | None = None
 
 
 class CustomFormatter(logging.Formatter):  # type: ignore
@@ -7,23 +22,121 @@ class CustomFormatter(logging.Formatter):  # type: ignore
     CYAN = "\x1b[36m"
     RESET = "\x1b[0m"
 
-    def format(self, record):
-        log_format = (
-            f"{self.CYAN}{record.levelname}{self.RESET}:     %(name)s - %(message)s"
+    def __init__(self):
+        # Формат собирается один раз, а не на каждую запись
+        super().__init__(
+            f"{self.CYAN}%(levelname)s{self.RESET}:     %(name)s - %(message)s"
         )
-        formatter = logging.Formatter(log_format)
-        return formatter.format(record)
+
+
+class JSONFormatter(logging.Formatter):
+    """Одна JSON строка на запись - для сборщиков логов."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        request_id = getattr(record, "request_id", None)
+        if request_id is not None:
+            data["request_id"] = request_id
+        if record.exc_info:
+            data["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(data, ensure_ascii=False)
+
+
+class RequestIdFilter(logging.Filter):
+    """Добавляет в запись request_id; работает в потоке, который пишет лог."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get()
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Пропускает долю rate записей ниже WARNING от указанных логгеров
+    (и их дочерних). Предупреждения и ошибки не отбрасываются никогда.
+    """
+
+    def __init__(self, rates: dict[str, float]):
+        super().__init__()
+        self._rates = rates
+        self._resolved: dict[str, float] = {}
+
+    def _rate(self, name: str) -> float:
+        rate = self._resolved.get(name)
+        if rate is None:
+            rate = 1.0
+            candidate = name
+            while candidate:
+                if candidate in self._rates:
+                    rate = self._rates[candidate]
+                    break
+                candidate = candidate.rpartition(".")[0]
+            self._resolved[name] = rate
+        return rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self._rate(record.name)
+        return rate >= 1.0 or random.random() < rate
+
+
+class _QueueHandler(QueueHandler):
+    """
+    QueueHandler, который в вызывающем потоке только подставляет аргументы
+    в сообщение. Форматирование (включая traceback) - в потоке слушателя.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
 
 
 def setup_logging():
-    """Настраивает корневой логгер для использования кастомного форматера."""
+    """
+    Настраивает корневой логгер: записи кладутся в очередь, а форматирование
+    и вывод выполняет фоновый поток, не блокируя event loop.
+    """
+    global _listener
+
+    formatter = JSONFormatter() if settings.LOG_FORMAT == "json" else CustomFormatter()
     handler = logging.StreamHandler()
-    handler.setFormatter(CustomFormatter())
+    handler.setFormatter(formatter)
+
+    log_queue: queue.SimpleQueue[logging.LogRecord] = queue.SimpleQueue()
+    queue_handler = _QueueHandler(log_queue)
+    # Сначала сэмплирование - отброшенным записям request_id не нужен
+    if settings.LOG_SAMPLING:
+        queue_handler.addFilter(SamplingFilter(settings.LOG_SAMPLING))
+    queue_handler.addFilter(RequestIdFilter())
 
     root_logger = logging.getLogger()
     # Очищаем существующих обработчиков, чтобы избежать дублирования логов
     if root_logger.hasHandlers():
         root_logger.handlers.clear()
+    if _listener is not None:
+        _listener.stop()
+
+    root_logger.addHandler(queue_handler)
+    root_logger.setLevel(settings.LOG_LEVEL)
+
+    _listener = QueueListener(log_queue, handler)
+    _listener.start()
+
+
+def stop_logging():
+    """Дописывает оставшиеся в очереди записи и останавливает фоновый поток."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
 
-    root_logger.addHandler(handler)
-    root_logger.setLevel(logging.INFO)
+atexit.register(stop_logging)
@@ -1,4 +1,5 @@
 from pathlib import Path
+from typing import Literal
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -11,16 +12,117 @@ BASE_DIR = Path(__file__).resolve().parent.parent.parent.parent
 class Settings(BaseSettings):
     # Строка подключения к БД для psycopg3
     DATABASE_URL: str = "..."
+    # Реплики только для чтения (JSON список URL); пусто - все читаем с primary
+    DATABASE_REPLICA_URLS: list[str] = []
+    # На сколько секунд исключать реплику из ротации после ошибки соединения
+    DATABASE_REPLICA_EJECT_SECONDS: int = 30
+    # Серверные prepared statements psycopg: "auto" - выключены за пулером
+    # в transaction mode (порт 6543, Supavisor/PgBouncer), иначе включены
+    DB_STATEMENT_CACHE: Literal["auto", "prepared", "disabled"] = "auto"
+    # После скольких выполнений запрос готовится на сервере (0 - сразу)
+    DB_PREPARE_THRESHOLD: int = 2
+    # Размер кэша скомпилированных SQLAlchemy запросов на движок
+    DB_COMPILED_CACHE_SIZE: int = 500
+    # Общий лимит соединений к БД на все процессы приложения; пул каждого
+    # процесса - DB_MAX_CONNECTIONS // WEB_CONCURRENCY (число воркеров)
+    DB_MAX_CONNECTIONS: int = 5
+    WEB_CONCURRENCY: int = 1
+    DB_MAX_OVERFLOW: int = 0
+    DB_POOL_TIMEOUT: float = 30.0
+    # Допуск к пулу: сколько Unit of Work ждут свободного соединения,
+    # сколько секунд от начала запроса можно ждать (дальше - 503 с
+    # Retry-After) и обслуживать ли записи раньше чтений
+    DB_ADMISSION_ENABLED: bool = True
+    DB_ADMISSION_QUEUE: int = 100
+    DB_ADMISSION_TIMEOUT: float = 2.0
+    DB_ADMISSION_WRITE_PRIORITY: bool = True
+    DB_ADMISSION_RETRY_AFTER: int = 1
+    # Сколько соединений пула открыть при старте, до приема трафика
+    DB_POOL_WARMUP: int = 2
+    # Сколько секунд после SIGTERM отвечать 503 на /system/ready, продолжая
+    # обслуживать запросы, прежде чем сервер начнет остановку: за это время
+    # балансировщик снимает экземпляр с трафика
+    SHUTDOWN_PRESTOP_DELAY: float = 5.0
     SUPABASE_PROJECT_NAME: str = "..."
     SUPABASE_DATABASE_PASSWORD: str = "..."
     SUPABASE_URL: str = "..."
     SUPABASE_ANON_PABLIC_KEY: str = "..."
     SUPABASE_SERVICE_ROLE_KEY: str = "..."
+    # Пул HTTP соединений к Supabase (keep-alive), таймауты в секундах
+    SUPABASE_HTTP_MAX_CONNECTIONS: int = 100
+    SUPABASE_HTTP_MAX_KEEPALIVE: int = 20
+    SUPABASE_HTTP_KEEPALIVE_EXPIRY: float = 30.0
+    SUPABASE_HTTP_TIMEOUT: float = 5.0
+    SUPABASE_HTTP_CONNECT_TIMEOUT: float = 2.0
+
     USER1EMAIL: str = "..."
     USER1PASSWORD: str = "..."
     USER2EMAIL: str = "..."
     USER2PASSWORD: str = "..."
 
+    # Read-through кэш чтений сервисного слоя
+    CACHE_ENABLED: bool = True
+    CACHE_TTL: int = 30
+    CACHE_MAXSIZE: int = 1024
+
+    # Сколько строк за раз читать из серверного курсора при выгрузке
+    EXPORT_FETCH_SIZE: int = 1000
+    # Массовая вставка: строк в одном INSERT и порог перехода на COPY
+    BULK_INSERT_CHUNK_SIZE: int = 1000
+    BULK_COPY_THRESHOLD: int = 10_000
+    # Групповой коммит одиночных create: одновременные вызовы собираются
+    # в пачку до GROUP_COMMIT_MAX_BATCH записей, ожидая не дольше
+    # GROUP_COMMIT_LINGER_MS, и пишутся одной транзакцией
+    GROUP_COMMIT_ENABLED: bool = False
+    GROUP_COMMIT_MAX_BATCH: int = 100
+    GROUP_COMMIT_LINGER_MS: float = 2.0
+
+    # Онлайн миграции больших таблиц: строк в одной пачке backfill, пауза
+    # между пачками (сек), допустимое отставание реплик (сек), сколько
+    # ждать реплики, прежде чем прервать backfill (сек), и сколько
+    # DDL/UPDATE может ждать блокировку, прежде чем отступить и повторить
+    BACKFILL_BATCH_SIZE: int = 1000
+    BACKFILL_SLEEP: float = 0.1
+    BACKFILL_MAX_REPLICATION_LAG: float = 5.0
+    BACKFILL_REPLICA_WAIT_TIMEOUT: float = 600.0
+    MIGRATION_LOCK_TIMEOUT: str = "5s"
+
+    # Проверка access token: "remote" - запросом в Supabase Auth,
+    # "local" - по подписи JWT (секрет проекта или JWKS)
+    AUTH_VERIFY_MODE: Literal["local", "remote"] = "remote"
+    # Ходить в Supabase, если локально проверить токен нечем (нет ключа)
+    AUTH_REMOTE_FALLBACK: bool = False
+    # Секрет проекта для токенов HS256 (Settings -> API -> JWT Secret)
+    SUPABASE_JWT_SECRET: str = ""
+    SUPABASE_JWT_AUDIENCE: str = "authenticated"
+    # Время жизни кэша JWKS (асимметричные ключи проекта), секунды
+    SUPABASE_JWKS_CACHE_TTL: int = 600
+
+    # Кэш "токен -> пользователь"; запись живет до exp токена или до TTL
+    AUTH_CACHE_ENABLED: bool = True
+    AUTH_CACHE_MAXSIZE: int = 10_000
+    AUTH_CACHE_TTL: int = 60
+    # Сколько помнить невалидный токен, чтобы не долбить Supabase
+    AUTH_NEGATIVE_CACHE_TTL: int = 10
+
+    # Логи: уровень, формат ("text" - цветной для разработки, "json" - для
+    # сборщиков логов) и доля пропускаемых записей ниже WARNING по логгерам,
+    # например {"httpx": 0.1} - записывать 10% логов httpx
+    LOG_LEVEL: str = "INFO"
+    LOG_FORMAT: Literal["text", "json"] = "text"
+    LOG_SAMPLING: dict[str, float] = {}
+
+    # Метрики Prometheus на /metrics; Server-Timing - время фаз запроса
+    # (auth, pool, db) в заголовке ответа, раскрывает детали - по умолчанию выключен
+    METRICS_ENABLED: bool = True
+    METRICS_SERVER_TIMING: bool = False
+
+    # Профайлер запросов к БД: лог медленных запросов и поиск N+1 по запросам API
+    DB_PROFILER_ENABLED: bool = False
+    DB_SLOW_QUERY_MS: float = 200
+    # Сколько одинаковых запросов за один запрос API считать N+1
+    DB_N_PLUS_ONE_THRESHOLD: int = 5
+
     model_config = SettingsConfigDict(
         env_file=BASE_DIR / ".env",
         env_file_encoding="utf-8",
@@ -1,10 +1,82 @@
-import supabase
+import httpx
+from supabase_auth import AsyncGoTrueClient
 
 from app.config.settings import settings
 
-# Создаем единственный, глобальный экземпляр клиента Supabase
-# Этот клиент будет переиспользоваться во всем приложении
-supabase_client: supabase.Client = supabase.create_client(
-    settings.SUPABASE_URL,
-    settings.SUPABASE_SERVICE_ROLE_KEY,
-)
+# Общий пул HTTP соединений к Supabase и асинхронный клиент Auth.
+# Создаются в lifespan приложения (init_supabase) и закрываются при остановке.
+_http_client: httpx.AsyncClient | None = None
+_auth_client: AsyncGoTrueClient | None = None
+
+
+def _create_http_client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        limits=httpx.Limits(
+            max_connections=settings.SUPABASE_HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.SUPABASE_HTTP_MAX_KEEPALIVE,
+            keepalive_expiry=settings.SUPABASE_HTTP_KEEPALIVE_EXPIRY,
+        ),
+        timeout=httpx.Timeout(
+            settings.SUPABASE_HTTP_TIMEOUT,
+            connect=settings.SUPABASE_HTTP_CONNECT_TIMEOUT,
+        ),
+        follow_redirects=True,
+    )
+
+
+def _create_auth_client(http_client: httpx.AsyncClient) -> AsyncGoTrueClient:
+    # Без persist_session сессия после входа все равно остается в памяти
+    # клиента (_in_memory_session), но не пишется в хранилище и не обновляется
+    return AsyncGoTrueClient(
+        url=f"{settings.SUPABASE_URL}/auth/v1",
+        headers={
+            "apiKey": settings.SUPABASE_SERVICE_ROLE_KEY,
+            "Authorization": f"Bearer {settings.SUPABASE_SERVICE_ROLE_KEY}",
+        },
+        http_client=http_client,
+        persist_session=False,
+        auto_refresh_token=False,
+    )
+
+
+async def init_supabase() -> None:
+    """Создает пул соединений и клиент Supabase Auth."""
+    global _http_client, _auth_client
+    if _auth_client is not None:
+        return
+    _http_client = _create_http_client()
+    # Общий клиент только для вызовов с явно переданным токеном (get_user):
+    # они не сохраняют сессию. Вход - через get_login_auth_client
+    _auth_client = _create_auth_client(_http_client)
+
+
+async def close_supabase() -> None:
+    """Закрывает пул соединений к Supabase."""
+    global _http_client, _auth_client
+    if _http_client is not None:
+        await _http_client.aclose()
+    _http_client = None
+    _auth_client = None
+
+
+def get_supabase_auth() -> AsyncGoTrueClient:
+    """Возвращает единый экземпляр асинхронного клиента Supabase Auth."""
+    if _auth_client is None:
+        raise RuntimeError("Supabase client is not initialized")
+    return _auth_client
+
+
+def get_login_auth_client() -> AsyncGoTrueClient:
+    """
+    Отдельный клиент Auth на один вход: sign_in сохраняет сессию в клиенте,
+    и токены пользователя не должны оставаться в общем экземпляре.
+    Пул HTTP соединений общий, поэтому клиент дешевый.
+    """
+    return _create_auth_client(get_http_client())
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Возвращает общий пул HTTP соединений к Supabase."""
+    if _http_client is None:
+        raise RuntimeError("Supabase client is not initialized")
+    return _http_client
@@ -1,3 +1,4 @@
+from .base import BaseDAO
 from .example import ExampleDAO
 
-__all__ = ["ExampleDAO"]
+__all__ = ["BaseDAO", "ExampleDAO"]
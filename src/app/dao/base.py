@@ -0,0 +1,366 @@
+from datetime import datetime
+from typing import (
+    Any,
+    AsyncIterable,
+    AsyncIterator,
+    ClassVar,
+    Generic,
+    Hashable,
+    Mapping,
+    Sequence,
+    TypeVar,
+)
+
+from psycopg import sql
+from sqlalchemy import (
+    ARRAY,
+    ColumnElement,
+    any_,
+    bindparam,
+    delete,
+    func,
+    insert,
+    select,
+    tuple_,
+    update,
+)
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import InstrumentedAttribute
+
+from app.dto.base import BaseDTO
+from app.schemas import Base
+
+ModelT = TypeVar("ModelT", bound=Base)
+CreateDTOT = TypeVar("CreateDTOT", bound=BaseDTO)
+DTOT = TypeVar("DTOT", bound=BaseDTO)
+
+# Ключ набора фильтров: (колонка, сравнение с NULL) - для IS NULL нужен другой SQL
+FilterKey = tuple[tuple[str, bool], ...]
+
+
+class BaseDAO(Generic[ModelT, CreateDTOT, DTOT]):
+    """
+    Базовый Data Access Object для моделей, унаследованных от schemas.Base.
+
+    Наследник задает model, create_dto и dto. Колонки DTO берутся из его
+    полей, первичный ключ - из модели (одна колонка). Запросы строятся
+    один раз: постоянные - при объявлении класса, зависящие от набора
+    фильтров или колонок - при первом вызове, дальше берутся из кэша.
+    Значения всегда передаются параметрами, поэтому текст SQL одинаков
+    и SQLAlchemy с psycopg переиспользуют компиляцию и prepared statements.
+    Коммит делает Unit of Work.
+    """
+
+    model: ClassVar[type[Base]]
+    create_dto: ClassVar[type[BaseDTO]]
+    dto: ClassVar[type[BaseDTO]]
+
+    _pk: ClassVar[InstrumentedAttribute[Any]]
+    _create_columns: ClassVar[list[str]]
+    _dto_columns: ClassVar[tuple[InstrumentedAttribute[Any], ...]]
+    _statements: ClassVar[dict[Hashable, Any]]
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        if "model" not in cls.__dict__:
+            return
+        primary_key = cls.model.__mapper__.primary_key
+        if len(primary_key) != 1:
+            raise TypeError(f"{cls.__name__}: нужен первичный ключ из одной колонки")
+        cls._pk = getattr(cls.model, primary_key[0].key)
+        cls._create_columns = list(cls.create_dto.model_fields)
+        cls._dto_columns = tuple(getattr(cls.model, f) for f in cls.dto.model_fields)
+        ids = bindparam("ids", type_=ARRAY(cls._pk.type))
+        cls._statements = {
+            "insert": insert(cls.model).returning(*cls._dto_columns),
+            "insert_many": insert(cls.model).returning(
+                *cls._dto_columns, sort_by_parameter_order=True
+            ),
+            "select_all": select(*cls._dto_columns),
+            "select_all_ordered": select(*cls._dto_columns).order_by(cls._pk),
+            "select_by_id": select(*cls._dto_columns).where(cls._pk == bindparam("id")),
+            # = ANY(массив): один текст SQL при любом количестве id
+            "select_by_ids": select(*cls._dto_columns).where(cls._pk == any_(ids)),
+            "delete_by_ids": delete(cls.model).where(cls._pk == any_(ids)),
+            # Массовый UPDATE по первичному ключу (executemany)
+            "update_many": update(cls.model),
+            "version": select(func.count(), func.max(cls.model.modified_at)),
+            "copy": sql.SQL("COPY {} ({}) FROM STDIN").format(
+                sql.Identifier(cls.model.__tablename__),
+                sql.SQL(", ").join(map(sql.Identifier, cls._create_columns)),
+            ),
+        }
+
+    @classmethod
+    def _statement(cls, key: Hashable, build) -> Any:
+        statement = cls._statements.get(key)
+        if statement is None:
+            statement = cls._statements[key] = build()
+        return statement
+
+    @classmethod
+    def _filter_key(cls, filters: Mapping[str, Any] | None) -> FilterKey:
+        if not filters:
+            return ()
+        return tuple(sorted((name, value is None) for name, value in filters.items()))
+
+    @classmethod
+    def _where(cls, filter_key: FilterKey) -> list[ColumnElement[bool]]:
+        # Фильтры на равенство; значения подставляются параметрами f_<колонка>
+        return [
+            getattr(cls.model, name).is_(None)
+            if is_null
+            else getattr(cls.model, name) == bindparam(f"f_{name}")
+            for name, is_null in filter_key
+        ]
+
+    @staticmethod
+    def _filter_params(filters: Mapping[str, Any] | None) -> dict[str, Any]:
+        if not filters:
+            return {}
+        return {f"f_{k}": v for k, v in filters.items() if v is not None}
+
+    @classmethod
+    def _to_dto(cls, row: Any) -> DTOT:
+        return cls.dto.model_validate(row)  # type: ignore[return-value]
+
+    @classmethod
+    async def create(cls, session: AsyncSession, data: CreateDTOT) -> DTOT:
+        # Один INSERT ... RETURNING: значения по умолчанию (id, created_at)
+        # приходят из БД без отдельного refresh
+        result = await session.execute(cls._statements["insert"], data.model_dump())
+        return cls._to_dto(result.one())
+
+    @classmethod
+    async def get_by_id(cls, session: AsyncSession, record_id: Any) -> DTOT | None:
+        result = await session.execute(
+            cls._statements["select_by_id"], {"id": record_id}
+        )
+        row = result.one_or_none()
+        return cls._to_dto(row) if row is not None else None
+
+    @classmethod
+    async def get_many(cls, session: AsyncSession, ids: Sequence[Any]) -> list[DTOT]:
+        """Записи по списку id одним запросом; порядок не гарантирован."""
+        if not ids:
+            return []
+        result = await session.execute(
+            cls._statements["select_by_ids"], {"ids": list(ids)}
+        )
+        return [cls._to_dto(row) for row in result]
+
+    @classmethod
+    async def get_all(cls, session: AsyncSession) -> list[DTOT]:
+        # Строки колонок, без ORM объектов
+        result = await session.execute(cls._statements["select_all"])
+        return [cls._to_dto(row) for row in result]
+
+    @classmethod
+    async def get_page(
+        cls,
+        session: AsyncSession,
+        filters: Mapping[str, Any] | None = None,
+        order_by: str | None = None,
+        descending: bool = False,
+        after: Sequence[Any] | None = None,
+        limit: int = 100,
+    ) -> list[DTOT]:
+        """
+        Страница записей с keyset пагинацией.
+
+        Сортировка по (order_by, первичный ключ) - ключ делает порядок
+        однозначным. after - значения этих колонок у последней записи
+        предыдущей страницы; без него возвращается первая страница.
+        """
+        filter_key = cls._filter_key(filters)
+        key = ("page", filter_key, order_by, descending, after is not None)
+
+        def build():
+            columns = [cls._pk]
+            if order_by is not None and order_by != cls._pk.key:
+                columns.insert(0, getattr(cls.model, order_by))
+            where = cls._where(filter_key)
+            if after is not None:
+                row = tuple_(*columns)
+                bound = tuple_(*(bindparam(f"a_{i}") for i in range(len(columns))))
+                where.append(row < bound if descending else row > bound)
+            ordering = [c.desc() if descending else c.asc() for c in columns]
+            return (
+                select(*cls._dto_columns)
+                .where(*where)
+                .order_by(*ordering)
+                .limit(bindparam("limit"))
+            )
+
+        params = cls._filter_params(filters)
+        params["limit"] = limit
+        if after is not None:
+            params.update({f"a_{i}": value for i, value in enumerate(after)})
+        result = await session.execute(cls._statement(key, build), params)
+        return [cls._to_dto(row) for row in result]
+
+    @classmethod
+    async def count(
+        cls,
+        session: AsyncSession,
+        filters: Mapping[str, Any] | None = None,
+    ) -> int:
+        filter_key = cls._filter_key(filters)
+        statement = cls._statement(
+            ("count", filter_key),
+            lambda: (
+                select(func.count())
+                .select_from(cls.model)
+                .where(*cls._where(filter_key))
+            ),
+        )
+        result = await session.execute(statement, cls._filter_params(filters))
+        return result.scalar_one()
+
+    @classmethod
+    async def get_version(cls, session: AsyncSession) -> tuple[int, datetime | None]:
+        """
+        Число строк и max(modified_at) - дешевый признак изменения таблицы:
+        вставка и обновление меняют время, удаление - число строк.
+        """
+        result = await session.execute(cls._statements["version"])
+        count, modified_at = result.one()
+        return count, modified_at
+
+    @classmethod
+    async def stream_all(
+        cls,
+        session: AsyncSession,
+        fetch_size: int,
+    ) -> AsyncIterator[list[DTOT]]:
+        # Читаем серверным курсором пачками по fetch_size строк,
+        # не загружая всю таблицу в память
+        result = await session.stream(
+            cls._statements["select_all_ordered"].execution_options(
+                yield_per=fetch_size
+            )
+        )
+        async for rows in result.partitions():
+            yield [cls._to_dto(row) for row in rows]
+
+    @classmethod
+    async def bulk_create(
+        cls,
+        session: AsyncSession,
+        items: Sequence[CreateDTOT],
+    ) -> list[DTOT]:
+        # Один многострочный INSERT ... RETURNING вместо запроса на каждую запись
+        result = await session.execute(
+            cls._statements["insert_many"],
+            [item.model_dump() for item in items],
+        )
+        return [cls._to_dto(row) for row in result]
+
+    @classmethod
+    async def upsert(
+        cls,
+        session: AsyncSession,
+        items: Sequence[CreateDTOT],
+        conflict_columns: Sequence[str],
+        update_columns: Sequence[str] | None = None,
+    ) -> list[DTOT]:
+        """
+        INSERT ... ON CONFLICT (conflict_columns): существующие записи
+        обновляются колонками update_columns (по умолчанию - всеми из
+        create_dto, кроме conflict_columns). Пустой update_columns - DO NOTHING,
+        тогда возвращаются только вставленные записи.
+        """
+        if not items:
+            return []
+        if update_columns is None:
+            update_columns = [
+                c for c in cls._create_columns if c not in conflict_columns
+            ]
+        key = ("upsert", tuple(conflict_columns), tuple(update_columns))
+
+        def build():
+            statement = pg_insert(cls.model)
+            if update_columns:
+                set_ = {c: statement.excluded[c] for c in update_columns}
+                # DO UPDATE не применяет onupdate колонок - время изменения
+                # ставим сами, иначе ETag и Last-Modified не заметят upsert
+                set_["modified_at"] = func.now()
+                statement = statement.on_conflict_do_update(
+                    index_elements=list(conflict_columns), set_=set_
+                )
+            else:
+                statement = statement.on_conflict_do_nothing(
+                    index_elements=list(conflict_columns)
+                )
+            return statement.returning(*cls._dto_columns)
+
+        result = await session.execute(
+            cls._statement(key, build),
+            [item.model_dump() for item in items],
+        )
+        return [cls._to_dto(row) for row in result]
+
+    @classmethod
+    async def update_by_ids(
+        cls,
+        session: AsyncSession,
+        ids: Sequence[Any],
+        values: Mapping[str, Any],
+    ) -> int:
+        """Одинаковые значения для всех записей из ids; возвращает число строк."""
+        if not ids or not values:
+            return 0
+        columns = tuple(sorted(values))
+        statement = cls._statement(
+            ("update_by_ids", columns),
+            lambda: (
+                update(cls.model)
+                .where(cls._pk == any_(bindparam("ids", type_=ARRAY(cls._pk.type))))
+                .values({c: bindparam(f"v_{c}") for c in columns})
+            ),
+        )
+        params = {f"v_{c}": values[c] for c in columns}
+        params["ids"] = list(ids)
+        result = await session.execute(statement, params)
+        return result.rowcount  # type: ignore[attr-defined]
+
+    @classmethod
+    async def bulk_update(
+        cls,
+        session: AsyncSession,
+        rows: Sequence[Mapping[str, Any]],
+    ) -> None:
+        """
+        Разные значения для разных записей: каждая строка содержит первичный
+        ключ и обновляемые колонки. Выполняется одним executemany.
+        """
+        if rows:
+            await session.execute(cls._statements["update_many"], list(rows))
+
+    @classmethod
+    async def delete_by_ids(cls, session: AsyncSession, ids: Sequence[Any]) -> int:
+        if not ids:
+            return 0
+        result = await session.execute(
+            cls._statements["delete_by_ids"], {"ids": list(ids)}
+        )
+        return result.rowcount  # type: ignore[attr-defined]
+
+    @classmethod
+    async def copy_create(
+        cls,
+        session: AsyncSession,
+        items: AsyncIterable[CreateDTOT],
+    ) -> int:
+        # COPY FROM STDIN через соединение psycopg в рамках текущей транзакции
+        connection = await session.connection()
+        raw_connection = await connection.get_raw_connection()
+        columns = cls._create_columns
+        created = 0
+        async with raw_connection.driver_connection.cursor() as cursor:
+            async with cursor.copy(cls._statements["copy"]) as copy:
+                async for item in items:
+                    await copy.write_row([getattr(item, c) for c in columns])
+                    created += 1
+        return created
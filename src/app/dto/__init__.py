@@ -4,7 +4,20 @@
 Содержит Pydantic-модели для передачи данных между слоями приложения.
 """
 
+from app.dto.auth import AuthUserDTO
 from app.dto.base import BaseDTO
-from app.dto.example import ExampleCreateDTO, ExampleDTO
+from app.dto.example import (
+    ExampleBulkResultDTO,
+    ExampleCreateDTO,
+    ExampleDTO,
+    ExamplePageDTO,
+)
 
-__all__ = ["BaseDTO", "ExampleDTO", "ExampleCreateDTO"]
+__all__ = [
+    "AuthUserDTO",
+    "BaseDTO",
+    "ExampleDTO",
+    "ExampleCreateDTO",
+    "ExampleBulkResultDTO",
+    "ExamplePageDTO",
+]
@@ -0,0 +1,14 @@
+"""
+DTO объекты для аутентифицированного пользователя.
+"""
+from uuid import UUID
+
+from app.dto.base import BaseDTO
+
+
+class AuthUserDTO(BaseDTO):
+    """DTO пользователя Supabase, полученного из access token."""
+
+    id: UUID
+    email: str | None = None
+    role: str | None = None
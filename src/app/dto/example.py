@@ -18,3 +18,16 @@ class ExampleDTO(BaseDTO):
     id: int
     name: str
     created_at: datetime
+
+
+class ExampleBulkResultDTO(BaseDTO):
+    """DTO с результатом массового создания записей Example."""
+    
+    created: int
+
+
+class ExamplePageDTO(BaseDTO):
+    """DTO страницы записей Example с курсором следующей страницы."""
+
+    items: list[ExampleDTO]
+    next_cursor: str | None = None
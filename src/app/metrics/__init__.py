@@ -0,0 +1,42 @@
+"""
+Метрики в формате Prometheus и замеры фаз запроса для Server-Timing.
+"""
+
+from app.metrics.db import TimedAsyncQueuePool, instrument_engine
+from app.metrics.profiler import (
+    QueryLog,
+    assert_max_queries,
+    capture_queries,
+    install_query_profiler,
+    normalize_sql,
+)
+from app.metrics.registry import (
+    Counter,
+    GaugeCallback,
+    Histogram,
+    render_metrics,
+)
+from app.metrics.timing import (
+    add_timing,
+    server_timing_header,
+    start_request_timings,
+    timed,
+)
+
+__all__ = [
+    "Counter",
+    "GaugeCallback",
+    "Histogram",
+    "QueryLog",
+    "TimedAsyncQueuePool",
+    "add_timing",
+    "assert_max_queries",
+    "capture_queries",
+    "install_query_profiler",
+    "instrument_engine",
+    "normalize_sql",
+    "render_metrics",
+    "server_timing_header",
+    "start_request_timings",
+    "timed",
+]
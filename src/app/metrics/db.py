@@ -0,0 +1,106 @@
+import logging
+import time
+from typing import Iterable
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from app.metrics.registry import GaugeCallback, Histogram, LabelValues
+from app.metrics.timing import add_timing
+
+# Бакеты для запросов и ожидания пула - мельче стандартных
+DB_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+DB_QUERY_DURATION = Histogram(
+    "db_query_duration_seconds",
+    "Время выполнения SQL запроса (курсор).",
+    ["engine"],
+    buckets=DB_BUCKETS,
+)
+DB_POOL_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Время получения соединения из пула, включая открытие нового.",
+    ["engine"],
+    buckets=DB_BUCKETS,
+)
+
+# Движки, пулы которых отдаются в gauges: имя -> движок
+_engines: dict[str, AsyncEngine] = {}
+
+
+class TimedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """
+    Пул, который замеряет ожидание свободного соединения.
+    Имя движка для метки берется из pool_logging_name.
+    """
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            elapsed = time.perf_counter() - started
+            DB_POOL_WAIT.observe(elapsed, self.logging_name or "default")
+            add_timing("pool", elapsed)
+
+
+# Логгер пула назван по модулю класса и выпадает из иерархии "sqlalchemy",
+# где SQLAlchemy по умолчанию выставляет WARNING - выставляем так же
+logging.getLogger(f"{__name__}.{TimedAsyncQueuePool.__name__}").setLevel(
+    logging.WARNING
+)
+
+
+def instrument_engine(engine: AsyncEngine, name: str) -> None:
+    """Подписывается на события движка: время запросов и состояние пула."""
+    _engines[name] = engine
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, many):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, many):
+        elapsed = time.perf_counter() - conn.info["query_started"].pop()
+        DB_QUERY_DURATION.observe(elapsed, name)
+        add_timing("db", elapsed)
+
+    @event.listens_for(engine.sync_engine, "handle_error")
+    def _handle_error(context):
+        started = (
+            context.connection.info.get("query_started") if context.connection else None
+        )
+        if started:
+            started.pop()
+
+
+def _pool_connections() -> Iterable[tuple[LabelValues, float]]:
+    for name, engine in _engines.items():
+        pool = engine.pool
+        if not isinstance(pool, AsyncAdaptedQueuePool):
+            continue
+        yield (name, "in_use"), pool.checkedout()
+        yield (name, "idle"), pool.checkedin()
+        yield (name, "overflow"), max(pool.overflow(), 0)
+
+
+def _pool_size() -> Iterable[tuple[LabelValues, float]]:
+    for name, engine in _engines.items():
+        pool = engine.pool
+        if isinstance(pool, AsyncAdaptedQueuePool):
+            yield (name,), pool.size()
+
+
+DB_POOL_CONNECTIONS = GaugeCallback(
+    "db_pool_connections",
+    "Соединения пула по состоянию: in_use, idle, overflow.",
+    _pool_connections,
+    ["engine", "state"],
+)
+DB_POOL_SIZE = GaugeCallback(
+    "db_pool_size",
+    "Постоянный размер пула (pool_size).",
+    _pool_size,
+    ["engine"],
+)
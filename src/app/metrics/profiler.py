@@ -0,0 +1,156 @@
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Iterator
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_PLACEHOLDER = re.compile(r"%\(\w+\)s|%s|\$\d+")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_CAST = re.compile(r"\?::\w+(?:\[\])?")
+_VALUE_LIST = re.compile(r"\?(?:\s*,\s*\?)+")
+_ROW_LIST = re.compile(r"(\(\?(?:, \.\.\.)?\))(?:\s*,\s*\(\?(?:, \.\.\.)?\))+")
+_WHITESPACE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=1024)
+def normalize_sql(statement: str) -> str:
+    """
+    SQL без значений: литералы и плейсхолдеры заменены на ?, списки
+    значений (IN, VALUES) свернуты - одинаковые запросы дают одну строку.
+    """
+    sql = _STRING_LITERAL.sub("?", statement)
+    sql = _PLACEHOLDER.sub("?", sql)
+    sql = _NUMBER.sub("?", sql)
+    sql = _CAST.sub("?", sql)
+    sql = _VALUE_LIST.sub("?, ...", sql)
+    sql = _ROW_LIST.sub(r"\1, ...", sql)
+    return _WHITESPACE.sub(" ", sql).strip()
+
+
+def _shape(parameters: Any) -> str:
+    if isinstance(parameters, dict):
+        items = ", ".join(f"{k}: {type(v).__name__}" for k, v in parameters.items())
+        return "{" + items + "}"
+    if isinstance(parameters, (list, tuple)):
+        return "(" + ", ".join(type(v).__name__ for v in parameters) + ")"
+    return type(parameters).__name__
+
+
+def params_shape(parameters: Any, many: bool) -> str:
+    """Форма параметров без значений - значения могут содержать личные данные."""
+    if many:
+        rows = list(parameters)
+        return f"{len(rows)} x {_shape(rows[0])}" if rows else "0 rows"
+    return _shape(parameters)
+
+
+@dataclass(frozen=True)
+class QueryRecord:
+    statement: str
+    params: str
+    duration: float
+
+
+@dataclass
+class QueryLog:
+    """Запросы, выполненные в рамках запроса к API или блока кода."""
+
+    queries: list[QueryRecord] = field(default_factory=list)
+
+    @property
+    def count(self) -> int:
+        return len(self.queries)
+
+    @property
+    def total_time(self) -> float:
+        return sum(query.duration for query in self.queries)
+
+    def repeated(self, threshold: int) -> list[tuple[str, int]]:
+        """Одинаковые запросы, выполненные threshold раз и больше (N+1)."""
+        counts = Counter(query.statement for query in self.queries)
+        return [(sql, n) for sql, n in counts.most_common() if n >= threshold]
+
+
+_query_log: ContextVar[QueryLog | None] = ContextVar("query_log", default=None)
+
+
+@contextmanager
+def capture_queries() -> Iterator[QueryLog]:
+    """Собирает запросы текущего контекста (и его дочерних задач) в QueryLog."""
+    log = QueryLog()
+    token = _query_log.set(log)
+    try:
+        yield log
+    finally:
+        _query_log.reset(token)
+
+
+@contextmanager
+def assert_max_queries(limit: int) -> Iterator[QueryLog]:
+    """
+    Хелпер для тестов: падает с AssertionError, если блок выполнил
+    больше limit запросов. Работает и без DB_PROFILER_ENABLED.
+
+        with assert_max_queries(1):
+            await ExampleService.get_all()
+    """
+    with capture_queries() as log:
+        yield log
+    if log.count > limit:
+        statements = "\n".join(f"  {query.statement}" for query in log.queries)
+        raise AssertionError(
+            f"Ожидалось не больше {limit} запросов, выполнено {log.count}:\n"
+            f"{statements}"
+        )
+
+
+def install_query_profiler(engine: AsyncEngine) -> None:
+    """
+    Подписывает профайлер на события движка. Запросы пишутся только
+    внутри capture_queries; медленные логируются, если профайлер включен.
+    """
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, many):
+        if context is not None and (
+            settings.DB_PROFILER_ENABLED or _query_log.get() is not None
+        ):
+            context._profiler_started = time.perf_counter()
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, many):
+        started = getattr(context, "_profiler_started", None)
+        if started is None:
+            return
+        duration = time.perf_counter() - started
+        log = _query_log.get()
+        slow = (
+            settings.DB_PROFILER_ENABLED
+            and duration * 1000 >= settings.DB_SLOW_QUERY_MS
+        )
+        if log is None and not slow:
+            return
+        record = QueryRecord(
+            normalize_sql(statement), params_shape(parameters, many), duration
+        )
+        if log is not None:
+            log.queries.append(record)
+        if slow:
+            logger.warning(
+                "Медленный запрос %.1f мс: %s; параметры: %s",
+                duration * 1000,
+                record.statement,
+                record.params,
+            )
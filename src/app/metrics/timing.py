@@ -0,0 +1,40 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator
+
+# Накопленное время по фазам текущего запроса (auth, db, pool), секунды.
+# Словарь создается в MetricsMiddleware; дочерние задачи видят тот же объект.
+_request_timings: ContextVar[dict[str, float] | None] = ContextVar(
+    "request_timings", default=None
+)
+
+
+def start_request_timings() -> dict[str, float]:
+    """Заводит накопитель фаз для текущего запроса."""
+    timings: dict[str, float] = {}
+    _request_timings.set(timings)
+    return timings
+
+
+def add_timing(phase: str, seconds: float) -> None:
+    """Добавляет время к фазе текущего запроса; вне запроса ничего не делает."""
+    timings = _request_timings.get()
+    if timings is not None:
+        timings[phase] = timings.get(phase, 0.0) + seconds
+
+
+@contextmanager
+def timed(phase: str) -> Iterator[None]:
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        add_timing(phase, time.perf_counter() - started)
+
+
+def server_timing_header(timings: dict[str, float], total: float) -> str:
+    """Значение заголовка Server-Timing; длительности в миллисекундах."""
+    parts = [f"{phase};dur={seconds * 1000:.2f}" for phase, seconds in timings.items()]
+    parts.append(f"app;dur={total * 1000:.2f}")
+    return ", ".join(parts)
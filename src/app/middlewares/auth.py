@@ -1,62 +1,104 @@
 import logging
+import re
+import time
 
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
+from starlette.requests import cookie_parser
 from starlette.responses import Response
+from starlette.types import ASGIApp, Receive, Scope, Send
 
-from app.config.supabase_client import supabase_client
+from app.metrics import Histogram, add_timing
+from app.services.auth import AuthService
+
+logger = logging.getLogger(__name__)
 
 ACCESS_COOKIE_NAME = "sb_at"
-PUBLIC_PATHS = ["/auth/login", "/docs", "/openapi.json"]
+PUBLIC_PATHS = ["/auth/login", "/docs", "/openapi.json", "/metrics", "/system/ready"]
+
+AUTH_DURATION = Histogram(
+    "auth_duration_seconds",
+    "Время проверки токена в AuthMiddleware (включая кэш) по результату.",
+    ["outcome"],
+)
+
+
+def compile_prefix_matcher(prefixes: list[str]) -> re.Pattern[str]:
+    """Собирает префиксы в один regex, чтобы не перебирать их на каждом запросе."""
+    if not prefixes:
+        return re.compile(r"(?!)")
+    # Длинные префиксы первыми - на случай вложенных путей
+    ordered = sorted(prefixes, key=len, reverse=True)
+    return re.compile("|".join(re.escape(prefix) for prefix in ordered))
+
+
+_public_path = compile_prefix_matcher(PUBLIC_PATHS)
+
 
+def _get_cookie(scope: Scope, name: str) -> str | None:
+    for key, value in scope["headers"]:
+        if key == b"cookie":
+            return cookie_parser(value.decode("latin-1")).get(name)
+    return None
 
-class AuthMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        logging.info(
-            f"AuthMiddleware received request: {request.method} {request.url.path}"
-        )
-        # Пропускаем WebSocket запросы без проверки
-        if request.scope["type"] == "websocket":
-            return await call_next(request)
 
-        # Пропускаем публичные эндпоинты
-        if any(request.url.path.startswith(path) for path in PUBLIC_PATHS):
-            return await call_next(request)
+class AuthMiddleware:
+    """
+    ASGI middleware аутентификации по cookie с access token Supabase.
 
-        # 0. Пропускаем OPTIONS запросы без проверки
-        if request.method == "OPTIONS":
-            response = await call_next(request)
-            return response
+    Заполняет request.state.user (email) и request.state.auth_user
+    (AuthUserDTO). Невалидный токен обрывает запрос с 401.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    @staticmethod
+    def _observe(started: float, outcome: str) -> None:
+        elapsed = time.perf_counter() - started
+        AUTH_DURATION.observe(elapsed, outcome)
+        add_timing("auth", elapsed)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        # Пропускаем WebSocket и lifespan без проверки
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        path = scope["path"]
+        logger.debug("AuthMiddleware received request: %s %s", scope["method"], path)
+
+        # Пропускаем публичные эндпоинты и OPTIONS запросы
+        if _public_path.match(path) or scope["method"] == "OPTIONS":
+            await self.app(scope, receive, send)
+            return
 
         # 1. Инициализируем user в state как None
-        request.state.user = None
+        state = scope.setdefault("state", {})
+        state["user"] = None
+        state["auth_user"] = None
 
         # 2. Пытаемся получить токен из cookie
-        token = request.cookies.get(ACCESS_COOKIE_NAME)
+        token = _get_cookie(scope, ACCESS_COOKIE_NAME)
 
         if token:
+            started = time.perf_counter()
             try:
-                # Используем единый клиент Supabase
-                user_response = supabase_client.auth.get_user(jwt=token)
-                if (
-                    user_response
-                    and user_response.user
-                    and user_response.user.aud == "authenticated"
-                ):  # type: ignore
-                    logging.info(f"Юзера получили2: {user_response.user.email}")  # type: ignore
-                    request.state.user = user_response.user.email
-                    response = await call_next(request)
-                    return response
-                else:
+                user = await AuthService.get_user(token)
+                if user is None:
                     raise ValueError("Невалидные данные пользователя из токена.")
-
             except Exception as e:
-                # Если токен есть, но он невалиден (истек, подделан),
-                # просто ничего не делаем. request.state.user останется None.
-                logging.warning(f"Ошибка валидации токена в middleware: {e}")
+                self._observe(
+                    started, "invalid" if isinstance(e, ValueError) else "error"
+                )
                 # Если токен есть, но он невалиден, прерываем запрос с ошибкой 401
-                return Response(status_code=401, content="Invalid or expired token")
+                logger.warning("Ошибка валидации токена в middleware: %s", e)
+                response = Response(status_code=401, content="Invalid or expired token")
+                await response(scope, receive, send)
+                return
+            self._observe(started, "ok")
+
+            logger.debug("Пользователь аутентифицирован: %s", user.email)
+            state["user"] = user.email
+            state["auth_user"] = user
 
-        # 6. Передаем управление дальше (либо к следующему middleware, либо к роуту)
-        response = await call_next(request)
-        return response
+        # 3. Передаем управление дальше (либо к следующему middleware, либо к роуту)
+        await self.app(scope, receive, send)
@@ -0,0 +1,101 @@
+import asyncio
+import logging
+import signal
+import threading
+from typing import Callable
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.config.admission import start_request_deadline
+from app.metrics import GaugeCallback
+
+logger = logging.getLogger(__name__)
+
+
+class RequestTracker:
+    """
+    Счетчик HTTP запросов в обработке и признак остановки:
+    после start_draining приложение не готово (/system/ready - 503).
+    """
+
+    def __init__(self):
+        self.in_flight = 0
+        self.draining = False
+
+    def started(self) -> None:
+        self.in_flight += 1
+
+    def finished(self) -> None:
+        self.in_flight -= 1
+
+    def start_draining(self) -> None:
+        self.draining = True
+
+
+request_tracker = RequestTracker()
+
+# Сколько запросов еще в обработке: при остановке видно, как идет дренаж
+HTTP_REQUESTS_IN_FLIGHT = GaugeCallback(
+    "http_requests_in_flight",
+    "HTTP запросы в обработке.",
+    lambda: [((), request_tracker.in_flight)],
+)
+
+
+def drain_on_sigterm(delay: float) -> Callable[[], None]:
+    """
+    По SIGTERM сразу переводит приложение в режим остановки, а сам сигнал
+    передает серверу (uvicorn) через delay секунд. Пока идет задержка,
+    /system/ready отвечает 503 и балансировщик снимает экземпляр с трафика,
+    а принятые и новые запросы обслуживаются как обычно. Дальше uvicorn
+    сам перестает принимать соединения и дожидается начатых запросов.
+    Повторный SIGTERM передается сразу. Возвращает функцию, которая
+    восстанавливает прежний обработчик.
+    """
+    # Обработчики сигналов ставятся только из главного потока
+    if threading.current_thread() is not threading.main_thread():
+        return lambda: None
+
+    loop = asyncio.get_running_loop()
+    previous = signal.getsignal(signal.SIGTERM)
+
+    def forward(frame) -> None:
+        if callable(previous):
+            previous(signal.SIGTERM, frame)
+        else:
+            signal.signal(signal.SIGTERM, previous)
+            signal.raise_signal(signal.SIGTERM)
+
+    def handler(signum, frame) -> None:
+        if request_tracker.draining:
+            forward(frame)
+            return
+        request_tracker.start_draining()
+        logger.info("SIGTERM: остановка через %s с", delay)
+        # Из обработчика сигнала в event loop - только call_soon_threadsafe
+        loop.call_soon_threadsafe(loop.call_later, delay, forward, frame)
+
+    signal.signal(signal.SIGTERM, handler)
+    return lambda: signal.signal(signal.SIGTERM, previous)
+
+
+class InFlightMiddleware:
+    """
+    ASGI middleware, который учитывает запросы в request_tracker
+    и начинает отсчет срока ожидания допуска к БД для запроса.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start_request_deadline()
+        request_tracker.started()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            request_tracker.finished()
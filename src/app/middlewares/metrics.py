@@ -0,0 +1,73 @@
+import time
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config.settings import settings
+from app.metrics import Histogram, server_timing_header, start_request_timings
+
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "Время обработки HTTP запроса по шаблону маршрута.",
+    ["method", "route", "status"],
+)
+
+
+def _route_label(scope: Scope) -> str:
+    """
+    Шаблон маршрута (/examples/{id}), а не сырой путь - чтобы не плодить
+    метки на каждый id.
+    """
+    route = scope.get("route")
+    if route is None:
+        return "unmatched"
+    # Новые версии FastAPI кладут в scope["route"] исходный маршрут
+    # подключенного роутера (без префикса), а полный шаблон - в контекст
+    # маршрута; старые - маршрут, уже собранный с префиксом
+    effective = scope.get("fastapi", {}).get("effective_route_context")
+    return getattr(effective, "path_format", None) or route.path_format
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware метрик: гистограмма времени по маршрутам и,
+    если включено, заголовок Server-Timing с фазами auth, pool, db.
+    Стоит снаружи Auth и профайлера запросов, чтобы учитывать их время.
+    """
+
+    def __init__(self, app: ASGIApp, server_timing: bool | None = None):
+        self.app = app
+        self.server_timing = (
+            settings.METRICS_SERVER_TIMING if server_timing is None else server_timing
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        timings = start_request_timings()
+        status = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if self.server_timing:
+                    headers = MutableHeaders(scope=message)
+                    total = time.perf_counter() - started
+                    headers.append(
+                        "Server-Timing", server_timing_header(timings, total)
+                    )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_REQUEST_DURATION.observe(
+                time.perf_counter() - started,
+                scope["method"],
+                _route_label(scope),
+                str(status),
+            )
@@ -0,0 +1,48 @@
+import logging
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.config.settings import settings
+from app.metrics.profiler import QueryLog, capture_queries
+
+logger = logging.getLogger(__name__)
+
+
+class QueryProfilerMiddleware:
+    """
+    ASGI middleware профайлера запросов к БД (DB_PROFILER_ENABLED).
+    Собирает запросы каждого HTTP запроса и предупреждает о N+1 -
+    одинаковых запросах, повторенных DB_N_PLUS_ONE_THRESHOLD раз и больше.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with capture_queries() as log:
+            try:
+                await self.app(scope, receive, send)
+            finally:
+                self._report(scope, log)
+
+    @staticmethod
+    def _report(scope: Scope, log: QueryLog) -> None:
+        for statement, count in log.repeated(settings.DB_N_PLUS_ONE_THRESHOLD):
+            logger.warning(
+                "Возможный N+1 в %s %s: запрос выполнен %d раз: %s",
+                scope["method"],
+                scope["path"],
+                count,
+                statement,
+            )
+        logger.debug(
+            "%s %s: %d запросов к БД за %.1f мс",
+            scope["method"],
+            scope["path"],
+            log.count,
+            log.total_time * 1000,
+        )
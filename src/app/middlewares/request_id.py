@@ -0,0 +1,48 @@
+import re
+import uuid
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config.logging import request_id_var
+
+REQUEST_ID_HEADER = "X-Request-ID"
+_REQUEST_ID_BYTES = REQUEST_ID_HEADER.lower().encode("latin-1")
+# Принимаем ID от прокси только безопасного вида, иначе генерируем свой
+_VALID_REQUEST_ID = re.compile(r"[A-Za-z0-9._-]{1,128}")
+
+
+def _incoming_request_id(scope: Scope) -> str | None:
+    for key, value in scope["headers"]:
+        if key == _REQUEST_ID_BYTES:
+            request_id = value.decode("latin-1")
+            if _VALID_REQUEST_ID.fullmatch(request_id):
+                return request_id
+            return None
+    return None
+
+
+class RequestIdMiddleware:
+    """
+    ASGI middleware ID запроса: берет X-Request-ID от прокси или создает новый,
+    кладет его в контекст логов и возвращает в заголовке ответа.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = _incoming_request_id(scope) or uuid.uuid4().hex
+        request_id_var.set(request_id)
+        scope.setdefault("state", {})["request_id"] = request_id
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).append(REQUEST_ID_HEADER, request_id)
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,26 @@
+"""
+Инструменты миграций больших таблиц без простоя: индексы CONCURRENTLY
+и backfill пачками с паузами, ожиданием реплик и сохранением прогресса.
+"""
+
+from app.migrations.online import (
+    PROGRESS_TABLE,
+    backfill,
+    backfill_status,
+    create_index_concurrently,
+    drop_index_concurrently,
+    replication_lag,
+    reset_backfill,
+    run_backfill,
+)
+
+__all__ = [
+    "PROGRESS_TABLE",
+    "backfill",
+    "backfill_status",
+    "create_index_concurrently",
+    "drop_index_concurrently",
+    "replication_lag",
+    "reset_backfill",
+    "run_backfill",
+]
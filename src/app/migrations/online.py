@@ -0,0 +1,343 @@
+import logging
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterator, Sequence, TypeVar
+
+from sqlalchemy import Connection, text
+from sqlalchemy.exc import DBAPIError
+
+from app.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Таблица прогресса backfill: по ней прерванный backfill продолжается
+# с последней записанной пачки. Alembic autogenerate ее не трогает.
+PROGRESS_TABLE = "backfill_progress"
+
+# SQLSTATE lock_not_available: не дождались блокировки за lock_timeout
+_LOCK_NOT_AVAILABLE = "55P03"
+_LOCK_RETRIES = 5
+
+_CREATE_PROGRESS_TABLE = text(f"""
+    CREATE TABLE IF NOT EXISTS {PROGRESS_TABLE} (
+        name TEXT PRIMARY KEY,
+        last_key BIGINT,
+        rows BIGINT NOT NULL DEFAULT 0,
+        done BOOLEAN NOT NULL DEFAULT FALSE,
+        updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+    )
+""")
+
+# Только физические реплики: логические подписчики (CDC, logical replication)
+# тоже видны в pg_stat_replication, но чтения приложения с них не идут
+_REPLICATION_LAG = text("""
+    SELECT COALESCE(EXTRACT(EPOCH FROM max(r.replay_lag)), 0)
+    FROM pg_stat_replication AS r
+    WHERE NOT EXISTS (
+        SELECT 1 FROM pg_replication_slots AS s
+        WHERE s.active_pid = r.pid AND s.slot_type = 'logical'
+    )
+""")
+
+
+def _is_lock_timeout(exc: DBAPIError) -> bool:
+    return getattr(exc.orig, "sqlstate", None) == _LOCK_NOT_AVAILABLE
+
+
+def _quote(connection: Connection, name: str) -> str:
+    return connection.dialect.identifier_preparer.quote(name)
+
+
+def _require_autocommit(connection: Connection) -> None:
+    if not getattr(connection.connection.driver_connection, "autocommit", False):
+        raise RuntimeError(
+            "Онлайн миграции выполняются вне транзакции: "
+            "используйте op.get_context().autocommit_block() "
+            "или соединение с isolation_level='AUTOCOMMIT'"
+        )
+
+
+@contextmanager
+def lock_timeout(connection: Connection, timeout: str | None = None) -> Iterator[None]:
+    """
+    Ограничивает ожидание блокировок: DDL или UPDATE, вставший в очередь
+    за долгой транзакцией, блокирует и всех, кто пришел после него.
+
+    В autocommit SET LOCAL не действует дольше одного запроса, поэтому
+    значение ставится на сессию и на выходе возвращается прежнее - иначе
+    оно досталось бы следующим миграциям на том же соединении.
+    """
+    previous = connection.execute(text("SHOW lock_timeout")).scalar_one()
+    connection.execute(
+        text("SELECT set_config('lock_timeout', :timeout, false)"),
+        {"timeout": timeout or settings.MIGRATION_LOCK_TIMEOUT},
+    )
+    try:
+        yield
+    finally:
+        connection.execute(
+            text("SELECT set_config('lock_timeout', :timeout, false)"),
+            {"timeout": previous},
+        )
+
+
+def _retry_lock_timeout(
+    action: Callable[[], T],
+    what: str,
+    delay: float = 1.0,
+    on_retry: Callable[[], None] | None = None,
+) -> T:
+    """
+    Повторяет action, если она не дождалась блокировки за lock_timeout:
+    отступить и повторить лучше, чем держать очередь за собой.
+    """
+    retries = 0
+    while True:
+        try:
+            return action()
+        except DBAPIError as e:
+            if not _is_lock_timeout(e) or retries >= _LOCK_RETRIES:
+                raise
+        retries += 1
+        logger.warning("%s: не дождались блокировки, повтор %d", what, retries)
+        time.sleep(delay)
+        if on_retry is not None:
+            on_retry()
+
+
+def replication_lag(connection: Connection) -> float:
+    """
+    Наибольшее отставание физических реплик от primary в секундах
+    (0 без реплик).
+    """
+    return float(connection.execute(_REPLICATION_LAG).scalar_one())
+
+
+def wait_for_replicas(
+    connection: Connection, max_lag: float, timeout: float | None = None
+) -> None:
+    """
+    Ждет, пока реплики не догонят primary до max_lag секунд. Если они
+    не догнали за timeout секунд, бросает TimeoutError: прогресс backfill
+    сохранен, и его можно продолжить позже.
+    """
+    timeout = settings.BACKFILL_REPLICA_WAIT_TIMEOUT if timeout is None else timeout
+    deadline = time.monotonic() + timeout
+    while (lag := replication_lag(connection)) > max_lag:
+        left = deadline - time.monotonic()
+        if left <= 0:
+            raise TimeoutError(f"Реплики отстают на {lag:.1f} с дольше {timeout:.0f} с")
+        logger.info("Отставание реплик %.1f с > %.1f с, ждем", lag, max_lag)
+        time.sleep(min(lag, 5.0, left))
+
+
+def ensure_progress_table(connection: Connection) -> None:
+    connection.execute(_CREATE_PROGRESS_TABLE)
+
+
+def backfill_status(connection: Connection) -> list[dict]:
+    """Состояние всех backfill из таблицы прогресса."""
+    ensure_progress_table(connection)
+    result = connection.execute(
+        text(
+            f"SELECT name, last_key, rows, done, updated_at "
+            f"FROM {PROGRESS_TABLE} ORDER BY name"
+        )
+    )
+    return [dict(row._mapping) for row in result]
+
+
+def reset_backfill(connection: Connection, name: str) -> None:
+    """Забывает прогресс backfill name - следующий запуск начнет сначала."""
+    ensure_progress_table(connection)
+    connection.execute(
+        text(f"DELETE FROM {PROGRESS_TABLE} WHERE name = :name"), {"name": name}
+    )
+
+
+def run_backfill(
+    connection: Connection,
+    name: str,
+    table: str,
+    set_clause: str,
+    where: str | None = None,
+    key: str = "id",
+    batch_size: int | None = None,
+    sleep: float | None = None,
+    max_lag: float | None = None,
+) -> int:
+    """
+    UPDATE table SET set_clause пачками по batch_size строк в порядке
+    целочисленного ключа key (keyset, без OFFSET). Каждая пачка - отдельная
+    короткая транзакция, поэтому блокировки строк держатся миллисекунды.
+
+    Между пачками - пауза sleep и ожидание реплик (max_lag). Последний
+    обработанный ключ записывается в таблицу прогресса тем же запросом,
+    что и пачка, поэтому прерванный backfill продолжится с места остановки.
+    where - дополнительное условие на строки (например, "col IS NULL"),
+    чтобы повторный запуск не переписывал уже заполненные.
+    Возвращает число обновленных строк за этот запуск.
+    """
+    _require_autocommit(connection)
+    batch_size = batch_size or settings.BACKFILL_BATCH_SIZE
+    sleep = settings.BACKFILL_SLEEP if sleep is None else sleep
+    max_lag = settings.BACKFILL_MAX_REPLICATION_LAG if max_lag is None else max_lag
+
+    ensure_progress_table(connection)
+    row = connection.execute(
+        text(f"SELECT last_key, done FROM {PROGRESS_TABLE} WHERE name = :name"),
+        {"name": name},
+    ).one_or_none()
+    if row is not None and row.done:
+        logger.info("Backfill %s уже выполнен", name)
+        return 0
+    last_key = row.last_key if row is not None and row.last_key is not None else None
+
+    table_sql = _quote(connection, table)
+    key_sql = _quote(connection, key)
+    where_sql = f"AND ({where})" if where else ""
+    # Граница пачки, UPDATE и запись прогресса - один запрос, то есть
+    # одна транзакция даже в autocommit
+    statement = text(f"""
+        WITH bounds AS (
+            SELECT max({key_sql}) AS upto FROM (
+                SELECT {key_sql} FROM {table_sql}
+                WHERE CAST(:last AS BIGINT) IS NULL OR {key_sql} > :last
+                ORDER BY {key_sql} LIMIT :batch_size
+            ) AS batch
+        ), updated AS (
+            UPDATE {table_sql} SET {set_clause}
+            FROM bounds
+            WHERE (CAST(:last AS BIGINT) IS NULL OR {table_sql}.{key_sql} > :last)
+                AND {table_sql}.{key_sql} <= bounds.upto {where_sql}
+            RETURNING 1
+        ), progress AS (
+            INSERT INTO {PROGRESS_TABLE} (name, last_key, rows, updated_at)
+            SELECT :name, upto, (SELECT count(*) FROM updated), now()
+            FROM bounds WHERE upto IS NOT NULL
+            ON CONFLICT (name) DO UPDATE SET
+                last_key = EXCLUDED.last_key,
+                rows = {PROGRESS_TABLE}.rows + EXCLUDED.rows,
+                updated_at = now()
+        )
+        SELECT upto, (SELECT count(*) FROM updated) AS rows FROM bounds
+    """)
+
+    total = 0
+    started = time.monotonic()
+    with lock_timeout(connection):
+        while True:
+            wait_for_replicas(connection, max_lag)
+            upto, rows = _retry_lock_timeout(
+                lambda: connection.execute(
+                    statement,
+                    {"last": last_key, "batch_size": batch_size, "name": name},
+                ).one(),
+                f"Backfill {name}",
+                delay=sleep * 10 or 1.0,
+            )
+            if upto is None:
+                break
+            last_key = upto
+            total += rows
+            logger.info(
+                "Backfill %s: %d строк, последний %s=%s, %.0f строк/с",
+                name,
+                total,
+                key,
+                last_key,
+                total / max(time.monotonic() - started, 1e-9),
+            )
+            if sleep:
+                time.sleep(sleep)
+
+    connection.execute(
+        text(
+            f"INSERT INTO {PROGRESS_TABLE} (name, done) VALUES (:name, TRUE) "
+            f"ON CONFLICT (name) DO UPDATE SET done = TRUE, updated_at = now()"
+        ),
+        {"name": name},
+    )
+    logger.info("Backfill %s выполнен: %d строк", name, total)
+    return total
+
+
+def _drop_invalid_index(connection: Connection, name: str) -> None:
+    # Прерванный CREATE INDEX CONCURRENTLY оставляет невалидный индекс,
+    # который IF NOT EXISTS принял бы за готовый
+    invalid = connection.execute(
+        text(
+            "SELECT NOT indisvalid FROM pg_index WHERE indexrelid = to_regclass(:name)"
+        ),
+        {"name": name},
+    ).scalar_one_or_none()
+    if invalid:
+        logger.warning(
+            "Удаляем невалидный индекс %s после прерванного построения", name
+        )
+        connection.execute(
+            text(f"DROP INDEX CONCURRENTLY IF EXISTS {_quote(connection, name)}")
+        )
+
+
+def create_index_concurrently(
+    name: str,
+    table: str,
+    columns: Sequence[str],
+    unique: bool = False,
+    **kw,
+) -> None:
+    """
+    CREATE INDEX CONCURRENTLY из upgrade() миграции Alembic: вне транзакции
+    миграции, без блокировки записи в таблицу. Если построение не дождалось
+    блокировки, невалидный индекс удаляется и построение повторяется;
+    повторный запуск после прерванной миграции тоже его пересоздает.
+    """
+    from alembic import op
+
+    with op.get_context().autocommit_block():
+        connection = op.get_bind()
+        with lock_timeout(connection):
+            _drop_invalid_index(connection, name)
+            _retry_lock_timeout(
+                lambda: op.create_index(
+                    name,
+                    table,
+                    list(columns),
+                    unique=unique,
+                    postgresql_concurrently=True,
+                    if_not_exists=True,
+                    **kw,
+                ),
+                f"Индекс {name}",
+                on_retry=lambda: _drop_invalid_index(connection, name),
+            )
+
+
+def drop_index_concurrently(name: str, table: str) -> None:
+    """DROP INDEX CONCURRENTLY из миграции Alembic, вне ее транзакции."""
+    from alembic import op
+
+    with op.get_context().autocommit_block():
+        connection = op.get_bind()
+        with lock_timeout(connection):
+            _retry_lock_timeout(
+                lambda: op.drop_index(
+                    name, table_name=table, postgresql_concurrently=True, if_exists=True
+                ),
+                f"Индекс {name}",
+            )
+
+
+def backfill(name: str, table: str, set_clause: str, **kw) -> int:
+    """
+    run_backfill из upgrade() миграции Alembic: транзакция миграции
+    фиксируется, пачки идут отдельными транзакциями. Для очень больших
+    таблиц лучше запускать отдельно от деплоя: make backfill -- run ...
+    """
+    from alembic import op
+
+    with op.get_context().autocommit_block():
+        return run_backfill(op.get_bind(), name, table, set_clause, **kw)
@@ -1,6 +1,6 @@
 import uuid
 
-from sqlalchemy import String
+from sqlalchemy import Index, String
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column
 
@@ -9,6 +9,11 @@ from .base import Base
 
 class Example(Base):
     __tablename__ = "example"
+    __table_args__ = (
+        # Лента пользователя: keyset пагинация по (created_at, id) внутри user_id
+        Index("ix_example_user_id_created_at_id", "user_id", "created_at", "id"),
+    )
+
     id: Mapped[int] = mapped_column(
         primary_key=True,
         autoincrement=True,
@@ -1,4 +1,5 @@
 # Сервисный слой приложения
+from .auth import AuthService
 from .example import ExampleService
 
-__all__ = ["ExampleService"]
+__all__ = ["AuthService", "ExampleService"]
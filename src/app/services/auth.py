@@ -0,0 +1,212 @@
+import asyncio
+import hashlib
+import logging
+import time
+
+import jwt
+from pydantic import ValidationError
+from supabase import AuthApiError
+
+from app.cache import MISSING, TTLCache
+from app.config.settings import settings
+from app.config.supabase_client import get_http_client, get_supabase_auth
+from app.dto.auth import AuthUserDTO
+from app.metrics import Histogram
+
+logger = logging.getLogger(__name__)
+
+SUPABASE_AUTH_DURATION = Histogram(
+    "supabase_auth_request_duration_seconds",
+    "Время запроса проверки токена в Supabase Auth.",
+)
+
+# Статусы Supabase Auth, означающие невалидный токен, а не сбой сервиса
+_REJECTED_TOKEN_STATUSES = frozenset({400, 401, 403})
+
+# Асимметричные алгоритмы, которыми Supabase подписывает токены через JWKS
+ASYMMETRIC_ALGORITHMS = frozenset({"RS256", "ES256", "EdDSA"})
+# Не перечитывать JWKS чаще, чем раз в N секунд из-за неизвестного kid
+JWKS_MIN_REFRESH_INTERVAL = 30
+
+
+class AuthKeyUnavailableError(Exception):
+    """Нет ключа для локальной проверки токена (секрет не задан, JWKS недоступен)."""
+
+
+class JWKSCache:
+    """
+    Кэш публичных ключей проекта Supabase из JWKS.
+    Ключи перечитываются по истечении TTL или при встрече неизвестного kid.
+    """
+
+    def __init__(self, url: str, ttl: int):
+        self._url = url
+        self._ttl = ttl
+        self._keys: dict[str, jwt.PyJWK] = {}
+        self._fetched_at = 0.0
+        self._lock = asyncio.Lock()
+
+    def _is_stale(self) -> bool:
+        return time.monotonic() - self._fetched_at > self._ttl
+
+    def _needs_refresh(self, kid: str) -> bool:
+        if self._is_stale():
+            return True
+        recently_fetched = (
+            time.monotonic() - self._fetched_at <= JWKS_MIN_REFRESH_INTERVAL
+        )
+        return kid not in self._keys and not recently_fetched
+
+    async def _refresh(self) -> None:
+        try:
+            response = await get_http_client().get(self._url)
+            response.raise_for_status()
+            jwk_set = jwt.PyJWKSet.from_dict(response.json())
+        except Exception as e:
+            logger.warning("Не удалось загрузить JWKS %s: %s", self._url, e)
+            # Пробуем позже, но не на каждом запросе
+            self._fetched_at = time.monotonic() - self._ttl + JWKS_MIN_REFRESH_INTERVAL
+            return
+        self._keys = {key.key_id: key for key in jwk_set.keys if key.key_id}
+        self._fetched_at = time.monotonic()
+
+    async def get_key(self, kid: str | None) -> jwt.PyJWK:
+        if kid is None:
+            raise AuthKeyUnavailableError("В заголовке токена нет kid.")
+        if self._needs_refresh(kid):
+            async with self._lock:
+                # Ключи могли обновиться, пока ждали блокировку
+                if self._needs_refresh(kid):
+                    await self._refresh()
+        key = self._keys.get(kid)
+        if key is None:
+            raise AuthKeyUnavailableError(f"Ключ {kid} не найден в JWKS.")
+        return key
+
+
+jwks_cache = JWKSCache(
+    f"{settings.SUPABASE_URL}/auth/v1/.well-known/jwks.json",
+    settings.SUPABASE_JWKS_CACHE_TTL,
+)
+
+user_cache = TTLCache(
+    maxsize=settings.AUTH_CACHE_MAXSIZE if settings.AUTH_CACHE_ENABLED else 0,
+    ttl=settings.AUTH_CACHE_TTL,
+    name="auth_users",
+)
+
+
+def _token_key(token: str) -> bytes:
+    # Сам токен в памяти не храним - только его хэш
+    return hashlib.sha256(token.encode()).digest()
+
+
+def _token_ttl(token: str) -> float | None:
+    """Сколько секунд токену осталось жить по claim exp (без проверки подписи)."""
+    try:
+        claims = jwt.decode(token, options={"verify_signature": False})
+        return float(claims["exp"]) - time.time()
+    except (jwt.InvalidTokenError, KeyError, TypeError, ValueError):
+        return None
+
+
+class AuthService:
+    """
+    Сервисный слой аутентификации.
+    Проверяет access token Supabase локально (по подписи) или удаленно.
+    """
+
+    @staticmethod
+    async def get_user(token: str) -> AuthUserDTO | None:
+        """
+        Возвращает пользователя по токену или None, если токен невалиден.
+        Ошибки доступа к Supabase пробрасываются как есть и не кэшируются.
+        """
+        key = _token_key(token)
+        cached = user_cache.get(key)
+        if cached is not MISSING:
+            return cached
+
+        user = await AuthService._verify(token)
+        if user is None:
+            user_cache.set(key, None, ttl=settings.AUTH_NEGATIVE_CACHE_TTL)
+        else:
+            user_cache.set(key, user, ttl=_token_ttl(token))
+        return user
+
+    @staticmethod
+    def invalidate(token: str) -> None:
+        """Удаляет токен из кэша (например, при выходе пользователя)."""
+        user_cache.delete(_token_key(token))
+
+    @staticmethod
+    async def _verify(token: str) -> AuthUserDTO | None:
+        if settings.AUTH_VERIFY_MODE == "local":
+            try:
+                return await AuthService._verify_local(token)
+            except AuthKeyUnavailableError as e:
+                if not settings.AUTH_REMOTE_FALLBACK:
+                    logger.warning("Локальная проверка токена невозможна: %s", e)
+                    return None
+                logger.debug("Локальная проверка невозможна, идем в Supabase: %s", e)
+        return await AuthService._verify_remote(token)
+
+    @staticmethod
+    async def _verify_local(token: str) -> AuthUserDTO | None:
+        try:
+            header = jwt.get_unverified_header(token)
+        except jwt.PyJWTError:
+            return None
+
+        algorithm = header.get("alg")
+        if algorithm == "HS256":
+            if not settings.SUPABASE_JWT_SECRET:
+                raise AuthKeyUnavailableError("SUPABASE_JWT_SECRET не задан.")
+            key = settings.SUPABASE_JWT_SECRET
+        elif algorithm in ASYMMETRIC_ALGORITHMS:
+            jwk = await jwks_cache.get_key(header.get("kid"))
+            # Алгоритм задает ключ, а не заголовок токена: alg другого типа
+            # (ES256 для RSA ключа) - подделка или ошибка, токен невалиден
+            if algorithm != jwk.algorithm_name:
+                return None
+            key = jwk.key
+        else:
+            return None
+
+        try:
+            claims = jwt.decode(
+                token,
+                key,
+                algorithms=[algorithm],
+                audience=settings.SUPABASE_JWT_AUDIENCE,
+                options={"require": ["exp", "sub"]},
+            )
+            return AuthUserDTO(
+                id=claims["sub"],
+                email=claims.get("email"),
+                role=claims.get("role"),
+            )
+        except (jwt.PyJWTError, ValidationError):
+            return None
+
+    @staticmethod
+    async def _verify_remote(token: str) -> AuthUserDTO | None:
+        started = time.perf_counter()
+        try:
+            user_response = await get_supabase_auth().get_user(jwt=token)
+        except AuthApiError as e:
+            # Токен отклонен Supabase (400 - некорректный JWT). Остальное,
+            # включая 429 и 408, - сбой сервиса: пробрасываем, без кэша
+            if e.status in _REJECTED_TOKEN_STATUSES:
+                return None
+            raise
+        finally:
+            SUPABASE_AUTH_DURATION.observe(time.perf_counter() - started)
+        if (
+            not user_response
+            or not user_response.user
+            or user_response.user.aud != settings.SUPABASE_JWT_AUDIENCE
+        ):
+            return None
+        user = user_response.user
+        return AuthUserDTO(id=user.id, email=user.email, role=user.role)
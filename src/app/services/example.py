@@ -1,6 +1,23 @@
+from datetime import datetime
+from itertools import batched
+from typing import AsyncGenerator, AsyncIterable, AsyncIterator, Sequence
+from uuid import UUID
+
+from app.cache import cached, invalidates, single_flight
+from app.cache.memory import register_stats
 from app.config.db import SqlAlchemyUnitOfWork
+from app.config.settings import settings
 from app.dao.example import ExampleDAO
 from app.dto.example import ExampleCreateDTO, ExampleDTO
+from app.services.group_commit import GroupCommitter
+
+# Пространство имен кэша чтений Example: сбрасывается при любой записи
+EXAMPLES_CACHE = "examples"
+
+
+async def _aiter(items: Sequence[ExampleCreateDTO]) -> AsyncIterator[ExampleCreateDTO]:
+    for item in items:
+        yield item
 
 
 class ExampleService:
@@ -10,14 +27,126 @@ class ExampleService:
     """
 
     @staticmethod
+    @invalidates(EXAMPLES_CACHE)
     async def create(data: ExampleCreateDTO) -> ExampleDTO:
+        if settings.GROUP_COMMIT_ENABLED:
+            # Возвращается после коммита пачки, в которую попала запись
+            return await _creates.submit(data)
+        return await ExampleService._create_one(data)
+
+    @staticmethod
+    async def _create_one(data: ExampleCreateDTO) -> ExampleDTO:
         async with SqlAlchemyUnitOfWork() as uow:
             example = await ExampleDAO.create(uow.session, data)
             await uow.commit()
             return example
 
     @staticmethod
-    async def get_all() -> list[ExampleDTO]:
+    async def _create_many(items: Sequence[ExampleCreateDTO]) -> list[ExampleDTO]:
+        # Один многострочный INSERT ... RETURNING: результаты в порядке items
+        async with SqlAlchemyUnitOfWork() as uow:
+            examples = await ExampleDAO.bulk_create(uow.session, items)
+            await uow.commit()
+            return examples
+
+    @staticmethod
+    @invalidates(EXAMPLES_CACHE)
+    async def bulk_create(examples: Sequence[ExampleCreateDTO]) -> int:
+        """
+        Создает записи одной транзакцией: пачками многострочных INSERT,
+        а очень большие наборы - через COPY.
+        """
+        if len(examples) >= settings.BULK_COPY_THRESHOLD:
+            return await ExampleService.bulk_create_stream(_aiter(examples))
+        async with SqlAlchemyUnitOfWork() as uow:
+            for chunk in batched(examples, settings.BULK_INSERT_CHUNK_SIZE):
+                await ExampleDAO.bulk_create(uow.session, chunk)
+            await uow.commit()
+        return len(examples)
+
+    @staticmethod
+    @invalidates(EXAMPLES_CACHE)
+    async def bulk_create_stream(examples: AsyncIterable[ExampleCreateDTO]) -> int:
+        """Создает записи из потока через COPY, не держа весь поток в памяти."""
         async with SqlAlchemyUnitOfWork() as uow:
+            created = await ExampleDAO.copy_create(uow.session, examples)
+            await uow.commit()
+        return created
+
+    @staticmethod
+    @cached(EXAMPLES_CACHE)
+    async def get_all() -> list[ExampleDTO]:
+        async with SqlAlchemyUnitOfWork(read_only=True) as uow:
             examples = await ExampleDAO.get_all(uow.session)
             return examples
+
+    @staticmethod
+    @cached(EXAMPLES_CACHE)
+    async def get_version() -> tuple[int, datetime | None]:
+        """
+        Только версия таблицы (count(*) и max(modified_at)), без строк -
+        для ответа 304 на условный GET.
+        """
+        async with SqlAlchemyUnitOfWork(read_only=True) as uow:
+            return await ExampleDAO.get_version(uow.session)
+
+    @staticmethod
+    @cached(EXAMPLES_CACHE)
+    async def get_all_versioned() -> tuple[
+        tuple[int, datetime | None], list[ExampleDTO]
+    ]:
+        """
+        Версия таблицы (число записей и время последнего изменения - для
+        ETag) и все записи из одного снимка БД. Кэшируются одной записью,
+        поэтому ETag всегда соответствует телу ответа.
+        """
+        async with SqlAlchemyUnitOfWork(read_only=True) as uow:
+            # REPEATABLE READ: оба запроса видят один и тот же снимок
+            await uow.session.connection(
+                execution_options={"isolation_level": "REPEATABLE READ"}
+            )
+            version = await ExampleDAO.get_version(uow.session)
+            examples = await ExampleDAO.get_all(uow.session)
+            return version, examples
+
+    @staticmethod
+    @single_flight(EXAMPLES_CACHE)
+    async def get_user_page(
+        user_id: UUID,
+        after: tuple[datetime, int] | None,
+        limit: int,
+    ) -> tuple[list[ExampleDTO], bool]:
+        """
+        Страница записей пользователя, новые первыми, после ключа
+        (created_at, id) последней записи предыдущей страницы.
+        Второй элемент результата - есть ли следующая страница.
+        """
+        async with SqlAlchemyUnitOfWork(read_only=True) as uow:
+            # Лишняя запись показывает, что дальше есть еще страница
+            examples = await ExampleDAO.get_page(
+                uow.session,
+                {"user_id": user_id},
+                order_by="created_at",
+                descending=True,
+                after=after,
+                limit=limit + 1,
+            )
+        return examples[:limit], len(examples) > limit
+
+    @staticmethod
+    async def export_all(fetch_size: int) -> AsyncGenerator[list[ExampleDTO], None]:
+        # Транзакция живет, пока потребитель вычитывает пачки
+        async with SqlAlchemyUnitOfWork(read_only=True) as uow:
+            async for batch in ExampleDAO.stream_all(uow.session, fetch_size):
+                yield batch
+
+
+# Пачки одиночных create при включенном GROUP_COMMIT_ENABLED
+_creates: GroupCommitter[ExampleCreateDTO, ExampleDTO] = GroupCommitter(
+    "examples",
+    ExampleService._create_many,
+    ExampleService._create_one,
+    max_batch=settings.GROUP_COMMIT_MAX_BATCH,
+    linger=settings.GROUP_COMMIT_LINGER_MS / 1000,
+)
+register_stats("group_commit_examples", _creates)
@@ -0,0 +1,146 @@
+import asyncio
+import contextvars
+import logging
+from typing import Awaitable, Callable, Generic, Sequence, TypeVar
+
+from sqlalchemy.exc import DataError, IntegrityError
+
+from app.config.db import pin_to_primary
+from app.metrics import Histogram
+
+ItemT = TypeVar("ItemT")
+ResultT = TypeVar("ResultT")
+
+GROUP_COMMIT_BATCH_SIZE = Histogram(
+    "group_commit_batch_size",
+    "Сколько записей попало в одну транзакцию группового коммита.",
+    ["name"],
+    buckets=(1, 2, 5, 10, 20, 50, 100, 200, 500),
+)
+
+
+class GroupCommitter(Generic[ItemT, ResultT]):
+    """
+    Групповой коммит: одновременные вызовы submit собираются в пачку
+    (до max_batch элементов или linger секунд от первого) и пишутся
+    одним вызовом write_many - одна транзакция и один fsync на пачку.
+
+    Каждый вызов получает свой результат и возвращается только после
+    коммита пачки. Если пачку отвергла БД из-за данных (IntegrityError,
+    DataError), ее элементы пишутся по одному через write_one, чтобы ошибка
+    одного не досталась остальным. Прочие ошибки (перегрузка, таймаут пула,
+    обрыв соединения) получают все элементы пачки - повтор по одному их
+    только усугубил бы.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        write_many: Callable[[Sequence[ItemT]], Awaitable[Sequence[ResultT]]],
+        write_one: Callable[[ItemT], Awaitable[ResultT]],
+        max_batch: int,
+        linger: float,
+    ):
+        self.name = name
+        self._write_many = write_many
+        self._write_one = write_one
+        self.max_batch = max_batch
+        self.linger = linger
+        self._pending: list[tuple[ItemT, asyncio.Future[ResultT]]] = []
+        self._timer: asyncio.TimerHandle | None = None
+        self._tasks: set[asyncio.Task[None]] = set()
+        self.batches = 0
+        self.items = 0
+        self.fallbacks = 0
+
+    async def submit(self, item: ItemT) -> ResultT:
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future[ResultT] = loop.create_future()
+        self._pending.append((item, future))
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.linger, self._flush)
+        # Отмена вызывающего не отменяет запись пачки для остальных
+        result = await asyncio.shield(future)
+        # Пачку коммитил отдельный таск - закрепляем чтения этого запроса
+        # за primary здесь, в контексте вызывающего
+        pin_to_primary()
+        return result
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        # Пустой контекст: иначе таск унаследовал бы contextvars того
+        # запроса, что открыл пачку (закрепление за primary, дедлайн и т.п.)
+        task = asyncio.get_running_loop().create_task(
+            self._write(batch), context=contextvars.Context()
+        )
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _write(self, batch: list[tuple[ItemT, asyncio.Future[ResultT]]]):
+        items = [item for item, _ in batch]
+        self.batches += 1
+        self.items += len(items)
+        GROUP_COMMIT_BATCH_SIZE.observe(len(items), self.name)
+        try:
+            results = await self._write_many(items)
+        except (IntegrityError, DataError) as e:
+            if len(items) == 1:
+                self._fail(batch, e)
+                return
+            self.fallbacks += 1
+            logging.warning(
+                "Групповой коммит %s: пачка из %d не записалась, пишем по одной: %s",
+                self.name,
+                len(items),
+                e,
+            )
+            await self._write_each(batch)
+            return
+        except BaseException as e:
+            self._fail(batch, e)
+            if not isinstance(e, Exception):
+                raise
+            return
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    async def _write_each(self, batch: list[tuple[ItemT, asyncio.Future[ResultT]]]):
+        # По одной и последовательно: пачка по одной записи не должна
+        # занять разом все соединения пула
+        for index, (item, future) in enumerate(batch):
+            try:
+                result = await self._write_one(item)
+            except (IntegrityError, DataError) as e:
+                if not future.done():
+                    future.set_exception(e)
+                continue
+            except BaseException as e:
+                self._fail(batch[index:], e)
+                if not isinstance(e, Exception):
+                    raise
+                return
+            if not future.done():
+                future.set_result(result)
+
+    @staticmethod
+    def _fail(batch: list[tuple[ItemT, asyncio.Future[ResultT]]], error: BaseException):
+        for _, future in batch:
+            if not future.done():
+                future.set_exception(error)
+
+    def stats(self) -> dict[str, int | float]:
+        return {
+            "pending": len(self._pending),
+            "batches": self.batches,
+            "items": self.items,
+            "fallbacks": self.fallbacks,
+            "avg_batch": round(self.items / self.batches, 2) if self.batches else 0.0,
+        }
@@ -1,20 +1,76 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
 
 from app.api import api_router
+from app.config.admission import ServiceOverloadedError
+from app.config.db import dispose_db, init_db
 from app.config.logging import setup_logging
+from app.config.settings import settings
+from app.config.supabase_client import close_supabase, init_supabase
 from app.middlewares.auth import AuthMiddleware
+from app.middlewares.in_flight import (
+    InFlightMiddleware,
+    drain_on_sigterm,
+    request_tracker,
+)
+from app.middlewares.metrics import MetricsMiddleware
+from app.middlewares.query_profiler import QueryProfilerMiddleware
+from app.middlewares.request_id import RequestIdMiddleware
 
 # Настройка логирования
 setup_logging()
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Создает общие ресурсы при старте (пул соединений к БД прогревается)
+    и освобождает их при остановке. Начатые запросы к этому моменту
+    уже завершены: их дожидается uvicorn до вызова shutdown.
+    """
+    await init_supabase()
+    await init_db()
+    restore_sigterm = drain_on_sigterm(settings.SHUTDOWN_PRESTOP_DELAY)
+    yield
+    restore_sigterm()
+    request_tracker.start_draining()
+    await dispose_db()
+    await close_supabase()
+
+
 # Инициализация FastAPI приложения
 app = FastAPI(
     title="Fast API Template",
     description="Шаблон FastAPI приложения без ORM",
     version="0.1.0",
+    lifespan=lifespan,
 )
 
+if settings.DB_PROFILER_ENABLED:
+    app.add_middleware(QueryProfilerMiddleware)
 app.add_middleware(AuthMiddleware)
+# Middleware, добавленный позже, оборачивает добавленные раньше.
+# Метрики снаружи Auth и профайлера - видят полное время их работы
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+# ID запроса выставляется до метрик и Auth и попадает во все логи запроса
+app.add_middleware(RequestIdMiddleware)
+# Самый внешний: учитывает запрос целиком и начинает отсчет срока допуска к БД
+app.add_middleware(InFlightMiddleware)
+
+
+@app.exception_handler(ServiceOverloadedError)
+async def service_overloaded_handler(request: Request, exc: ServiceOverloadedError):
+    # Быстрый отказ при перегрузке пула: клиент повторит через Retry-After
+    return JSONResponse(
+        status_code=503,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+
 # Подключаем все маршруты API
 app.include_router(api_router)
 
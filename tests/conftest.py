@@ -0,0 +1,43 @@
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import create_engine, text
+
+from app.config.db import dispose_db, get_engine, init_db
+from app.metrics.profiler import install_query_profiler
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+async def db():
+    """Пул соединений к DATABASE_URL; тест пропускается, если БД недоступна."""
+    try:
+        await init_db(warm_connections=0)
+        async with get_engine().connect() as connection:
+            await connection.execute(text("SELECT 1"))
+    except Exception as e:
+        await dispose_db()
+        pytest.skip(f"База данных недоступна: {e}")
+    yield
+    await dispose_db()
+
+
+@pytest.fixture
+def sqlite_engine():
+    """
+    SQLite в памяти с профайлером запросов: число запросов проверяется
+    через assert_max_queries без PostgreSQL.
+    """
+    engine = create_engine("sqlite://")
+    # Профайлеру нужен только sync_engine асинхронного движка
+    install_query_profiler(SimpleNamespace(sync_engine=engine))
+    with engine.begin() as connection:
+        connection.execute(
+            text("CREATE TABLE item (id INTEGER PRIMARY KEY, name TEXT)")
+        )
+    yield engine
+    engine.dispose()
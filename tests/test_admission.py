@@ -0,0 +1,120 @@
+import asyncio
+
+import pytest
+
+from app.config.admission import (
+    AdmissionController,
+    ServiceOverloadedError,
+    start_request_deadline,
+)
+from app.config.settings import settings
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_acquire_within_capacity():
+    admission = AdmissionController(capacity=2, max_queue=0, timeout=1)
+
+    await admission.acquire()
+    await admission.acquire()
+
+    assert admission.stats() == {
+        "capacity": 2,
+        "in_use": 2,
+        "queued": 0,
+        "rejected": 0,
+    }
+    admission.release()
+    admission.release()
+    assert admission.in_use == 0
+
+
+async def test_full_queue_is_rejected():
+    admission = AdmissionController(capacity=1, max_queue=0, timeout=1, retry_after=3)
+    await admission.acquire()
+
+    with pytest.raises(ServiceOverloadedError) as error:
+        await admission.acquire()
+
+    assert error.value.retry_after == 3
+    assert admission.rejected == 1
+    assert admission.in_use == 1
+
+
+async def test_wait_times_out():
+    admission = AdmissionController(capacity=1, max_queue=1, timeout=0.01)
+    await admission.acquire()
+
+    with pytest.raises(ServiceOverloadedError):
+        await admission.acquire()
+
+    assert admission.queued == 0
+    assert admission.rejected == 1
+
+
+async def test_release_hands_slot_to_waiter():
+    admission = AdmissionController(capacity=1, max_queue=1, timeout=1)
+    await admission.acquire()
+    waiter = asyncio.create_task(admission.acquire())
+    await asyncio.sleep(0)
+    assert admission.queued == 1
+
+    admission.release()
+    await waiter
+
+    # Место перешло ожидающему, не освобождаясь
+    assert admission.in_use == 1
+    assert admission.queued == 0
+
+
+async def test_writes_go_before_reads():
+    admission = AdmissionController(capacity=1, max_queue=2, timeout=1)
+    await admission.acquire()
+    order: list[str] = []
+
+    async def acquire(name: str, write: bool) -> None:
+        await admission.acquire(write=write)
+        order.append(name)
+
+    read = asyncio.create_task(acquire("read", write=False))
+    await asyncio.sleep(0)
+    write = asyncio.create_task(acquire("write", write=True))
+    await asyncio.sleep(0)
+
+    admission.release()
+    await write
+    admission.release()
+    await read
+
+    assert order == ["write", "read"]
+
+
+async def test_cancelled_waiter_leaves_queue():
+    admission = AdmissionController(capacity=1, max_queue=1, timeout=1)
+    await admission.acquire()
+    waiter = asyncio.create_task(admission.acquire())
+    await asyncio.sleep(0)
+
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+
+    assert admission.queued == 0
+    admission.release()
+    assert admission.in_use == 0
+
+
+async def test_expired_request_deadline_is_rejected(monkeypatch):
+    monkeypatch.setattr(settings, "DB_ADMISSION_TIMEOUT", 0)
+    admission = AdmissionController(capacity=1, max_queue=1, timeout=1)
+    await admission.acquire()
+
+    async def request() -> None:
+        # Срок запроса истек раньше, чем освободилось место
+        start_request_deadline()
+        await admission.acquire()
+
+    # Отдельная задача - свой контекст, срок не достается другим тестам
+    with pytest.raises(ServiceOverloadedError):
+        await asyncio.create_task(request())
+    assert admission.queued == 0
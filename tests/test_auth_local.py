@@ -0,0 +1,105 @@
+import time
+import uuid
+
+import jwt
+import pytest
+from cryptography.hazmat.primitives.asymmetric import ec, rsa
+
+from app.config.settings import settings
+from app.services import auth
+from app.services.auth import AuthService
+
+pytestmark = pytest.mark.anyio
+
+SECRET = "test-secret-with-enough-length-for-hs256"
+KID = "test-key"
+
+
+@pytest.fixture(autouse=True)
+def local_mode(monkeypatch):
+    monkeypatch.setattr(settings, "AUTH_VERIFY_MODE", "local")
+    monkeypatch.setattr(settings, "AUTH_REMOTE_FALLBACK", False)
+    monkeypatch.setattr(settings, "SUPABASE_JWT_SECRET", SECRET)
+    auth.user_cache.clear()
+
+
+@pytest.fixture
+def rsa_key(monkeypatch):
+    """RSA ключ в кэше JWKS - без запроса к Supabase."""
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    jwk = jwt.PyJWK.from_dict(
+        {
+            **jwt.algorithms.RSAAlgorithm.to_jwk(
+                private_key.public_key(), as_dict=True
+            ),
+            "kid": KID,
+        }
+    )
+    monkeypatch.setattr(auth.jwks_cache, "_keys", {KID: jwk})
+    monkeypatch.setattr(auth.jwks_cache, "_fetched_at", time.monotonic())
+    return private_key
+
+
+def make_claims(**overrides):
+    claims = {
+        "sub": str(uuid.uuid4()),
+        "email": "user@example.com",
+        "role": "authenticated",
+        "aud": settings.SUPABASE_JWT_AUDIENCE,
+        "exp": int(time.time()) + 3600,
+    }
+    claims.update(overrides)
+    return claims
+
+
+async def test_valid_hs256():
+    claims = make_claims()
+    token = jwt.encode(claims, SECRET, algorithm="HS256")
+
+    user = await AuthService.get_user(token)
+
+    assert user is not None
+    assert str(user.id) == claims["sub"]
+    assert user.email == "user@example.com"
+
+
+async def test_valid_rs256(rsa_key):
+    token = jwt.encode(make_claims(), rsa_key, algorithm="RS256", headers={"kid": KID})
+
+    assert await AuthService.get_user(token) is not None
+
+
+async def test_expired():
+    token = jwt.encode(
+        make_claims(exp=int(time.time()) - 60), SECRET, algorithm="HS256"
+    )
+
+    assert await AuthService.get_user(token) is None
+
+
+async def test_wrong_signature():
+    token = jwt.encode(make_claims(), SECRET + "-other", algorithm="HS256")
+
+    assert await AuthService.get_user(token) is None
+
+
+async def test_wrong_kid(rsa_key):
+    token = jwt.encode(
+        make_claims(), rsa_key, algorithm="RS256", headers={"kid": "unknown"}
+    )
+
+    assert await AuthService.get_user(token) is None
+
+
+async def test_alg_mismatching_key_is_invalid(rsa_key):
+    # ES256 токен с kid RSA ключа: не TypeError из PyJWT, а невалидный токен
+    ec_key = ec.generate_private_key(ec.SECP256R1())
+    token = jwt.encode(make_claims(), ec_key, algorithm="ES256", headers={"kid": KID})
+
+    assert await AuthService.get_user(token) is None
+    # Попал в негативный кэш, как любой невалидный токен
+    assert auth.user_cache.get(auth._token_key(token)) is None
+
+
+async def test_garbage_token():
+    assert await AuthService.get_user("not-a-jwt") is None
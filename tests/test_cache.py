@@ -0,0 +1,178 @@
+import asyncio
+import uuid
+
+import pytest
+from sqlalchemy import text
+
+from app.cache import SingleFlight, cached, invalidate, single_flight
+from app.config.db import pin_to_primary
+from app.config.settings import settings
+from app.metrics import assert_max_queries
+
+pytestmark = pytest.mark.anyio
+
+CONCURRENCY = 10
+
+
+@pytest.fixture
+def load_names(sqlite_engine):
+    """Чтение из SQLite с паузой, чтобы одновременные вызовы пересеклись."""
+
+    async def load(prefix: str) -> list[str]:
+        await asyncio.sleep(0.01)
+        with sqlite_engine.connect() as connection:
+            rows = connection.execute(
+                text("SELECT name FROM item WHERE name LIKE :prefix"),
+                {"prefix": f"{prefix}%"},
+            )
+            return [name for (name,) in rows]
+
+    return load
+
+
+@pytest.fixture
+def namespace():
+    # Свое пространство имен на тест: кэш процесса общий
+    return f"test-{uuid.uuid4()}"
+
+
+async def test_single_flight_shares_one_call():
+    flight = SingleFlight()
+    calls = 0
+
+    async def load() -> int:
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return 42
+
+    results = await asyncio.gather(*(flight.do("key", load) for _ in range(5)))
+
+    assert results == [42] * 5
+    assert calls == 1
+    assert flight.stats() == {"in_flight": 0, "calls": 1, "shared": 4}
+
+
+async def test_single_flight_shares_errors_and_forgets_key():
+    flight = SingleFlight()
+
+    async def fail() -> None:
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    results = await asyncio.gather(
+        flight.do("key", fail), flight.do("key", fail), return_exceptions=True
+    )
+
+    assert [type(result) for result in results] == [ValueError, ValueError]
+    # Следующий вызов начинает новую загрузку
+    with pytest.raises(ValueError):
+        await flight.do("key", fail)
+    assert flight.calls == 2
+
+
+async def test_single_flight_cancelled_waiter_keeps_load():
+    flight = SingleFlight()
+
+    async def load() -> int:
+        await asyncio.sleep(0.01)
+        return 1
+
+    first = asyncio.create_task(flight.do("key", load))
+    second = asyncio.create_task(flight.do("key", load))
+    await asyncio.sleep(0)
+    first.cancel()
+
+    assert await second == 1
+
+
+async def test_cached_coalesces_misses_and_serves_hits(
+    monkeypatch, load_names, namespace
+):
+    monkeypatch.setattr(settings, "CACHE_ENABLED", True)
+    get_names = cached(namespace)(load_names)
+
+    with assert_max_queries(1):
+        results = await asyncio.gather(*(get_names("a") for _ in range(CONCURRENCY)))
+    assert results == [[]] * CONCURRENCY
+
+    with assert_max_queries(0):
+        await get_names("a")
+    # Другие аргументы - другой ключ
+    with assert_max_queries(1):
+        await get_names("b")
+
+
+async def test_cached_reloads_after_invalidation(
+    monkeypatch, sqlite_engine, load_names, namespace
+):
+    monkeypatch.setattr(settings, "CACHE_ENABLED", True)
+    get_names = cached(namespace)(load_names)
+    assert await get_names("a") == []
+
+    with sqlite_engine.begin() as connection:
+        connection.execute(text("INSERT INTO item (name) VALUES ('apple')"))
+    await invalidate(namespace)
+
+    with assert_max_queries(1):
+        assert await get_names("a") == ["apple"]
+
+
+async def test_cached_skips_result_loaded_before_invalidation(
+    monkeypatch, load_names, namespace
+):
+    monkeypatch.setattr(settings, "CACHE_ENABLED", True)
+    get_names = cached(namespace)(load_names)
+
+    loading = asyncio.create_task(get_names("a"))
+    await asyncio.sleep(0)
+    # Запись завершилась, пока шла загрузка: ее результат устарел
+    await invalidate(namespace)
+    await loading
+
+    with assert_max_queries(1):
+        await get_names("a")
+
+
+async def test_cached_bypassed_after_write(monkeypatch, load_names, namespace):
+    monkeypatch.setattr(settings, "CACHE_ENABLED", True)
+    get_names = cached(namespace)(load_names)
+    await get_names("a")
+
+    async def request_after_write() -> None:
+        pin_to_primary()
+        with assert_max_queries(CONCURRENCY) as log:
+            await asyncio.gather(*(get_names("a") for _ in range(CONCURRENCY)))
+        # Ни кэша, ни общих загрузок: каждый вызов читает сам
+        assert log.count == CONCURRENCY
+
+    # Отдельная задача - свой контекст, закрепление не достается другим тестам
+    await asyncio.create_task(request_after_write())
+
+
+async def test_cached_without_cache_still_coalesces(monkeypatch, load_names, namespace):
+    monkeypatch.setattr(settings, "CACHE_ENABLED", False)
+    get_names = cached(namespace)(load_names)
+
+    with assert_max_queries(1):
+        await asyncio.gather(*(get_names("a") for _ in range(CONCURRENCY)))
+    # Результат не сохраняется
+    with assert_max_queries(1):
+        await get_names("a")
+
+
+async def test_single_flight_decorator_scopes_calls(load_names, namespace):
+    current_user = "alice"
+    get_names = single_flight(namespace, scope=lambda: current_user)(load_names)
+
+    with assert_max_queries(1):
+        await asyncio.gather(*(get_names("a") for _ in range(CONCURRENCY)))
+
+    async def as_user(user: str) -> list[str]:
+        nonlocal current_user
+        current_user = user
+        return await get_names("a")
+
+    # Разные области видимости не делят загрузку
+    with assert_max_queries(2):
+        await asyncio.gather(as_user("alice"), as_user("bob"))
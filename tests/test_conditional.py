@@ -0,0 +1,92 @@
+from datetime import datetime, timedelta, timezone
+
+from starlette.requests import Request
+
+from app.api.conditional import Validators
+
+MODIFIED_AT = datetime(2024, 5, 1, 12, 30, 15, 654321, tzinfo=timezone.utc)
+
+
+def make_request(**headers: str) -> Request:
+    return Request(
+        {
+            "type": "http",
+            "method": "GET",
+            "path": "/",
+            "headers": [
+                (name.replace("_", "-").encode(), value.encode())
+                for name, value in headers.items()
+            ],
+        }
+    )
+
+
+def test_headers():
+    headers = Validators.from_version(3, MODIFIED_AT).headers()
+
+    assert headers["ETag"].startswith('W/"3-')
+    assert headers["Last-Modified"] == "Wed, 01 May 2024 12:30:15 GMT"
+    assert headers["Cache-Control"] == "no-cache"
+
+
+def test_version_changes_etag():
+    etag = Validators.from_version(3, MODIFIED_AT).etag
+
+    assert Validators.from_version(4, MODIFIED_AT).etag != etag
+    later = MODIFIED_AT + timedelta(microseconds=1)
+    assert Validators.from_version(3, later).etag != etag
+
+
+def test_if_none_match():
+    validators = Validators.from_version(3, MODIFIED_AT)
+    etag = validators.etag
+
+    assert validators.not_modified(make_request(if_none_match=etag))
+    # Слабое сравнение и список тегов
+    assert validators.not_modified(
+        make_request(if_none_match=f'"other", {etag.removeprefix("W/")}')
+    )
+    assert validators.not_modified(make_request(if_none_match="*"))
+    assert not validators.not_modified(make_request(if_none_match='W/"other"'))
+
+
+def test_if_modified_since_roundtrip():
+    validators = Validators.from_version(3, MODIFIED_AT)
+    last_modified = validators.headers()["Last-Modified"]
+
+    # Клиент возвращает ровно тот Last-Modified, что получил
+    assert validators.not_modified(make_request(if_modified_since=last_modified))
+    assert validators.not_modified(
+        make_request(if_modified_since="Wed, 01 May 2024 12:31:00 GMT")
+    )
+    assert not validators.not_modified(
+        make_request(if_modified_since="Wed, 01 May 2024 12:30:14 GMT")
+    )
+    assert not validators.not_modified(make_request(if_modified_since="garbage"))
+
+
+def test_if_none_match_wins_over_if_modified_since():
+    validators = Validators.from_version(3, MODIFIED_AT)
+    request = make_request(
+        if_none_match='W/"other"',
+        if_modified_since=validators.headers()["Last-Modified"],
+    )
+
+    assert not validators.not_modified(request)
+
+
+def test_is_conditional():
+    assert not Validators.is_conditional(make_request())
+    assert Validators.is_conditional(make_request(if_none_match="*"))
+    assert Validators.is_conditional(
+        make_request(if_modified_since="Wed, 01 May 2024 12:30:15 GMT")
+    )
+
+
+def test_not_modified_response():
+    validators = Validators.from_version(0, None)
+    response = validators.not_modified_response()
+
+    assert response.status_code == 304
+    assert response.headers["etag"] == validators.etag
+    assert "last-modified" not in response.headers
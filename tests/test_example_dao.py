@@ -0,0 +1,27 @@
+import pytest
+
+from app.config.db import SqlAlchemyUnitOfWork
+from app.dao.example import ExampleDAO
+from app.dto.example import ExampleCreateDTO
+from app.metrics import assert_max_queries
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_create_issues_single_insert_returning(db):
+    async with SqlAlchemyUnitOfWork() as uow:
+        with assert_max_queries(1) as log:
+            example = await ExampleDAO.create(
+                uow.session, ExampleCreateDTO(name="dao test")
+            )
+        # Изменения теста в базе не остаются
+        await uow.rollback()
+
+    assert log.count == 1
+    statement = log.queries[0].statement
+    assert statement.startswith("INSERT INTO example")
+    assert "RETURNING" in statement
+    # id и created_at пришли из RETURNING, без отдельного SELECT
+    assert example.id is not None
+    assert example.created_at is not None
+    assert example.name == "dao test"
@@ -0,0 +1,134 @@
+import asyncio
+import contextvars
+
+import pytest
+from sqlalchemy.exc import IntegrityError, OperationalError
+
+from app.config.db import is_primary_pinned
+from app.services.group_commit import GroupCommitter
+
+pytestmark = pytest.mark.anyio
+
+request_id: contextvars.ContextVar[str | None] = contextvars.ContextVar(
+    "test_request_id", default=None
+)
+
+
+class FakeStore:
+    """write_many / write_one, которые запоминают вызовы."""
+
+    def __init__(self, error: Exception | None = None):
+        self.error = error
+        self.batches: list[list[int]] = []
+        self.singles: list[int] = []
+        self.contexts: list[str | None] = []
+        self.concurrent = 0
+        self.max_concurrent = 0
+
+    async def write_many(self, items):
+        self.batches.append(list(items))
+        self.contexts.append(request_id.get())
+        if self.error is not None:
+            raise self.error
+        return [item * 10 for item in items]
+
+    async def write_one(self, item):
+        self.singles.append(item)
+        self.concurrent += 1
+        self.max_concurrent = max(self.max_concurrent, self.concurrent)
+        try:
+            await asyncio.sleep(0)
+            if item < 0:
+                raise integrity_error()
+            return item * 10
+        finally:
+            self.concurrent -= 1
+
+    def committer(self, max_batch: int = 100) -> GroupCommitter[int, int]:
+        return GroupCommitter(
+            "test", self.write_many, self.write_one, max_batch, linger=0.001
+        )
+
+
+def integrity_error() -> IntegrityError:
+    return IntegrityError("INSERT", {}, Exception("duplicate"))
+
+
+async def test_concurrent_submits_share_one_batch():
+    store = FakeStore()
+    committer = store.committer()
+
+    results = await asyncio.gather(*(committer.submit(i) for i in range(5)))
+
+    assert results == [0, 10, 20, 30, 40]
+    assert store.batches == [[0, 1, 2, 3, 4]]
+    assert committer.stats()["avg_batch"] == 5
+
+
+async def test_full_batch_is_flushed_at_once():
+    store = FakeStore()
+    committer = store.committer(max_batch=2)
+
+    await asyncio.gather(*(committer.submit(i) for i in range(4)))
+
+    assert store.batches == [[0, 1], [2, 3]]
+
+
+async def test_data_error_falls_back_to_sequential_writes():
+    store = FakeStore(error=integrity_error())
+    committer = store.committer()
+
+    results = await asyncio.gather(
+        *(committer.submit(i) for i in (1, -2, 3)), return_exceptions=True
+    )
+
+    assert results[0] == 10 and results[2] == 30
+    # Ошибку получает только вызов с некорректной записью
+    assert isinstance(results[1], IntegrityError)
+    assert store.singles == [1, -2, 3]
+    assert store.max_concurrent == 1
+    assert committer.fallbacks == 1
+
+
+async def test_other_errors_fail_whole_batch_without_fallback():
+    error = OperationalError("INSERT", {}, Exception("connection lost"))
+    store = FakeStore(error=error)
+    committer = store.committer()
+
+    results = await asyncio.gather(
+        *(committer.submit(i) for i in range(3)), return_exceptions=True
+    )
+
+    assert results == [error, error, error]
+    assert store.singles == []
+    assert committer.fallbacks == 0
+
+
+async def test_batch_runs_outside_caller_context():
+    store = FakeStore()
+    committer = store.committer()
+
+    async def request() -> int:
+        request_id.set("first")
+        result = await committer.submit(1)
+        # Чтения после записи этого запроса идут на primary
+        assert is_primary_pinned()
+        return result
+
+    await asyncio.create_task(request())
+
+    assert store.contexts == [None]
+    assert not is_primary_pinned()
+
+
+async def test_cancelled_caller_does_not_cancel_batch():
+    store = FakeStore()
+    committer = store.committer()
+
+    first = asyncio.create_task(committer.submit(1))
+    second = asyncio.create_task(committer.submit(2))
+    await asyncio.sleep(0)
+    first.cancel()
+
+    assert await second == 20
+    assert store.batches == [[1, 2]]
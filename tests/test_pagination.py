@@ -0,0 +1,38 @@
+from datetime import datetime, timezone
+
+import pytest
+from fastapi import HTTPException
+
+from app.api.example import ExampleCursor
+from app.api.pagination import decode_cursor, encode_cursor
+
+LAST = (datetime(2024, 5, 1, 12, 30, 15, 654321, tzinfo=timezone.utc), 42)
+
+
+def test_cursor_roundtrip():
+    cursor = encode_cursor(LAST)
+
+    assert decode_cursor(cursor, ExampleCursor) == LAST
+
+
+def test_cursor_is_url_safe():
+    cursor = encode_cursor(LAST)
+
+    assert "=" not in cursor
+    assert all(c.isalnum() or c in "-_" for c in cursor)
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "not base64!",
+        encode_cursor(("not a date", 42)),
+        encode_cursor((LAST[0],)),
+        encode_cursor({"id": 42}),
+    ],
+)
+def test_invalid_cursor_is_bad_request(cursor):
+    with pytest.raises(HTTPException) as error:
+        decode_cursor(cursor, ExampleCursor)
+
+    assert error.value.status_code == 400
@@ -0,0 +1,72 @@
+import pytest
+from sqlalchemy import text
+
+from app.metrics import assert_max_queries
+from app.metrics.profiler import capture_queries, normalize_sql, params_shape
+
+
+def test_normalize_sql_hides_values():
+    assert (
+        normalize_sql("SELECT * FROM t WHERE id IN (1, 2, 3) AND name = 'o''k'")
+        == "SELECT * FROM t WHERE id IN (?, ...) AND name = ?"
+    )
+    assert (
+        normalize_sql("SELECT  a\n FROM t WHERE x = $1::uuid LIMIT 10")
+        == "SELECT a FROM t WHERE x = ? LIMIT ?"
+    )
+
+
+def test_normalize_sql_folds_value_rows():
+    # Многострочный INSERT любой длины - одна строка
+    two = "INSERT INTO t (a, b) VALUES (%(a_0)s, %(b_0)s), (%(a_1)s, %(b_1)s)"
+    three = two + ", (%(a_2)s, %(b_2)s)"
+
+    assert normalize_sql(two) == "INSERT INTO t (a, b) VALUES (?, ...), ..."
+    assert normalize_sql(three) == normalize_sql(two)
+
+
+def test_params_shape_hides_values():
+    assert params_shape({"a": 1, "b": "secret"}, many=False) == "{a: int, b: str}"
+    assert params_shape((1, "secret"), many=False) == "(int, str)"
+    assert params_shape([{"a": 1}, {"a": 2}], many=True) == "2 x {a: int}"
+    assert params_shape([], many=True) == "0 rows"
+
+
+def test_assert_max_queries_passes_within_limit(sqlite_engine):
+    with sqlite_engine.connect() as connection:
+        with assert_max_queries(1) as log:
+            connection.execute(text("SELECT name FROM item WHERE id = :id"), {"id": 1})
+
+    assert log.count == 1
+    assert log.queries[0].statement == "SELECT name FROM item WHERE id = ?"
+    assert log.queries[0].params == "(int)"
+
+
+def test_assert_max_queries_fails_over_limit(sqlite_engine):
+    with sqlite_engine.connect() as connection:
+        with pytest.raises(AssertionError, match="не больше 1 запросов, выполнено 2"):
+            with assert_max_queries(1):
+                connection.execute(text("SELECT 1"))
+                connection.execute(text("SELECT 2"))
+
+
+def test_repeated_detects_n_plus_one(sqlite_engine):
+    with sqlite_engine.connect() as connection:
+        with capture_queries() as log:
+            connection.execute(text("SELECT id FROM item"))
+            for item_id in range(3):
+                connection.execute(
+                    text("SELECT name FROM item WHERE id = :id"), {"id": item_id}
+                )
+
+    assert log.repeated(3) == [("SELECT name FROM item WHERE id = ?", 3)]
+    assert log.repeated(4) == []
+
+
+def test_queries_outside_capture_are_not_recorded(sqlite_engine):
+    with capture_queries() as log:
+        pass
+    with sqlite_engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+
+    assert log.count == 0